@@ -3,36 +3,117 @@ CRUD Operations
 Database create/read operations with encryption
 """
 
-from typing import Optional, Any
+import hashlib
+from datetime import datetime, timezone
+from typing import Optional, Any, Callable, Iterable, Union
+from sqlalchemy import Row, String, and_, bindparam, delete, exists, func, insert, lambda_stmt, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from app import models, schemas, security
+from app.cache import TTLCache
 
+# Decrypted integration secrets keyed by (user_id, service_name, ciphertext digest).
+# A changed ciphertext yields a new key, so stale plaintext is never served.
+_secrets_cache = TTLCache(maxsize=10_000, ttl=300)
+
+# Cache slot for the user's own Gemini key (never a valid integration service name)
+_GEMINI_KEY_SLOT = "@gemini"
+
+
+# ============== Cached Statements ==============
+# Hot lookups are built once as lambda statements, so each call skips
+# rebuilding the select() and computing its cache key.
+
+_user_by_email = lambda_stmt(
+    lambda: select(models.User).where(models.User.email == bindparam("email"))
+)
+_user_id_exists = lambda_stmt(
+    lambda: select(models.User.id).where(models.User.id == bindparam("user_id"))
+)
+_conversation_owner = lambda_stmt(
+    lambda: select(models.Conversation.owner_id).where(
+        models.Conversation.id == bindparam("conversation_id")
+    )
+)
+_email_taken = lambda_stmt(
+    lambda: select(exists().where(models.User.email == bindparam("email")))
+)
+_user_has_gemini_key = lambda_stmt(
+    lambda: select(models.User.encrypted_gemini_key.isnot(None)).where(
+        models.User.id == bindparam("user_id")
+    )
+)
+_integrations_by_owner = lambda_stmt(
+    lambda: select(models.Integration).where(models.Integration.owner_id == bindparam("user_id"))
+)
+_integration_secrets_by_owner = lambda_stmt(
+    lambda: select(
+        models.Integration.service_name,
+        models.Integration.encrypted_api_key,
+        models.Integration.encrypted_credentials,
+    ).where(models.Integration.owner_id == bindparam("user_id"))
+)
+_integration_by_service = lambda_stmt(
+    lambda: select(models.Integration).where(
+        models.Integration.owner_id == bindparam("user_id"),
+        models.Integration.service_name == bindparam("service_name"),
+    )
+)
+_conversation_messages = lambda_stmt(
+    lambda: select(
+        models.Message.id,
+        models.Message.conversation_id,
+        models.Message.role,
+        models.Message.content,
+        models.Message.actions_json,
+        models.Message.created_at,
+    ).where(
+        models.Message.conversation_id == bindparam("conversation_id")
+    ).order_by(models.Message.created_at, models.Message.id)
+)
 
 # ============== User Operations ==============
 
 def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
     """Get a user by email address."""
-    return db.query(models.User).filter(models.User.email == email).first()
+    return db.execute(_user_by_email, {"email": email}).scalars().first()
 
 
 def get_user_by_id(db: Session, user_id: int) -> Optional[models.User]:
-    """Get a user by ID."""
-    return db.query(models.User).filter(models.User.id == user_id).first()
+    """Get a user by ID (served from the session identity map when already loaded)."""
+    return db.get(models.User, user_id)
+
+
+def email_exists(db: Session, email: str) -> bool:
+    """Check whether an email is registered without loading the user row."""
+    return db.execute(_email_taken, {"email": email}).scalar()
 
 
-def create_user(db: Session, user: schemas.UserCreate) -> models.User:
+def user_exists(db: Session, user_id: int) -> bool:
+    """Check whether a user exists without loading the full row."""
+    return db.execute(_user_id_exists, {"user_id": user_id}).scalar() is not None
+
+
+def create_user(
+    db: Session,
+    user: schemas.UserCreate,
+    hashed_password: Optional[str] = None
+) -> models.User:
     """
     Create a new user with hashed password.
     
     Args:
         db: Database session
         user: User creation schema with email and password
+        hashed_password: Precomputed bcrypt hash of user.password (hashed here if omitted)
         
     Returns:
         Created User model instance
     """
-    hashed_password = security.get_password_hash(user.password)
+    if hashed_password is None:
+        hashed_password = security.get_password_hash(user.password)
     db_user = models.User(
         email=user.email,
         name=user.name,
@@ -40,21 +121,15 @@ def create_user(db: Session, user: schemas.UserCreate) -> models.User:
     )
     db.add(db_user)
     db.commit()
-    db.refresh(db_user)
     return db_user
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[models.User]:
-    """Authenticate user with email and password."""
-    user = get_user_by_email(db, email)
-    if not user:
-        return None
-    if not security.verify_password(password, user.hashed_password):
-        return None
-    return user
-
-
-def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate) -> Optional[models.User]:
+def update_user(
+    db: Session,
+    user_id: int,
+    user_update: schemas.UserUpdate,
+    hashed_password: Optional[str] = None
+) -> Optional[models.User]:
     """
     Update user details.
     
@@ -62,6 +137,7 @@ def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate) -> O
         db: Database session
         user_id: ID of user to update
         user_update: Schema with update fields
+        hashed_password: Precomputed bcrypt hash of user_update.password (hashed here if omitted)
         
     Returns:
         Updated User model or None if user not found
@@ -70,17 +146,26 @@ def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate) -> O
     if not db_user:
         return None
     
-    if user_update.name is not None:
-        db_user.name = user_update.name
-    
-    if user_update.email is not None:
-        db_user.email = user_update.email
-        
+    changes = {
+        field: value
+        for field, value in user_update.model_dump(exclude_unset=True).items()
+        if value is not None and field != "password" and getattr(db_user, field) != value
+    }
     if user_update.password is not None:
-        db_user.hashed_password = security.get_password_hash(user_update.password)
-        
+        changes["hashed_password"] = hashed_password or security.get_password_hash(user_update.password)
+    
+    # Nothing to write: skip the UPDATE and the commit entirely
+    if not changes:
+        return db_user
+    
+    stmt = (
+        update(models.User)
+        .where(models.User.id == user_id)
+        .values(**changes)
+        .returning(models.User)
+    )
+    db_user = db.execute(stmt, execution_options={"populate_existing": True}).scalar_one()
     db.commit()
-    db.refresh(db_user)
     return db_user
 
 
@@ -102,48 +187,83 @@ def set_user_gemini_key(db: Session, user_id: int, gemini_key: str) -> bool:
     
     user.encrypted_gemini_key = security.encrypt_token(gemini_key) if gemini_key else None
     db.commit()
+    invalidate_integration_secrets(user_id, _GEMINI_KEY_SLOT)
     return True
 
 
-def get_user_gemini_key(db: Session, user_id: int) -> Optional[str]:
+def get_user_gemini_key(
+    db: Session,
+    user_id: int,
+    user: Optional[models.User] = None
+) -> Optional[str]:
     """
     Get decrypted Gemini API key for a user.
     
     Args:
         db: Database session
         user_id: User ID
+        user: Already-loaded user row, to skip the lookup
         
     Returns:
         Decrypted Gemini API key or None if not set
     """
-    user = get_user_by_id(db, user_id)
+    if user is None:
+        user = get_user_by_id(db, user_id)
     if not user or not user.encrypted_gemini_key:
         return None
-    return security.decrypt_token(user.encrypted_gemini_key)
+    return _decrypt_cached(
+        user_id, _GEMINI_KEY_SLOT, user.encrypted_gemini_key, security.decrypt_token
+    )
 
 
-def has_gemini_key(db: Session, user_id: int) -> bool:
-    """Check if user has a Gemini API key configured."""
-    user = get_user_by_id(db, user_id)
-    return user is not None and user.encrypted_gemini_key is not None
+def has_gemini_key(db: Session, user_id: int) -> Optional[bool]:
+    """Check if user has a Gemini API key configured; None if the user does not exist."""
+    return db.execute(_user_has_gemini_key, {"user_id": user_id}).scalar()
 
 
-def delete_user_gemini_key(db: Session, user_id: int) -> bool:
-    """Delete user's Gemini API key."""
-    user = get_user_by_id(db, user_id)
+def delete_user_gemini_key(
+    db: Session,
+    user_id: int,
+    user: Optional[models.User] = None
+) -> bool:
+    """Delete user's Gemini API key. Pass `user` if it is already loaded."""
+    if user is None:
+        user = get_user_by_id(db, user_id)
     if not user:
         return False
     user.encrypted_gemini_key = None
     db.commit()
+    invalidate_integration_secrets(user_id, _GEMINI_KEY_SLOT)
     return True
 
 # ============== Integration Operations ==============
 
+def _decrypt_cached(
+    user_id: int,
+    service_name: str,
+    ciphertext: Union[bytes, str],
+    decrypt: Callable[[Union[bytes, str]], Any]
+) -> Any:
+    """Decrypt an integration secret, reusing a previous result for the same ciphertext."""
+    data = ciphertext if isinstance(ciphertext, bytes) else ciphertext.encode()
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    key = (user_id, service_name, digest)
+    value = _secrets_cache.get(key)
+    if value is None:
+        value = decrypt(ciphertext)
+        _secrets_cache.set(key, value)
+    return value
+
+
+def invalidate_integration_secrets(user_id: int, service_name: str) -> None:
+    """Drop cached plaintext for a user's integration (or Gemini key slot) after it changes."""
+    service_name = service_name.lower()
+    _secrets_cache.discard_where(lambda key: key[0] == user_id and key[1] == service_name)
+
+
 def get_user_integrations(db: Session, user_id: int) -> list[models.Integration]:
     """Get all integrations for a user."""
-    return db.query(models.Integration).filter(
-        models.Integration.owner_id == user_id
-    ).all()
+    return list(db.execute(_integrations_by_owner, {"user_id": user_id}).scalars())
 
 
 def get_integration(
@@ -152,10 +272,15 @@ def get_integration(
     service_name: str
 ) -> Optional[models.Integration]:
     """Get a specific integration by user and service name."""
-    return db.query(models.Integration).filter(
-        models.Integration.owner_id == user_id,
-        models.Integration.service_name == service_name.lower()
-    ).first()
+    return db.execute(
+        _integration_by_service,
+        {"user_id": user_id, "service_name": service_name.lower()}
+    ).scalars().first()
+
+
+def _dialect_insert(db: Session) -> Callable:
+    """INSERT construct with ON CONFLICT support for the session's database."""
+    return pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
 
 
 def add_integration(
@@ -178,38 +303,107 @@ def add_integration(
     Returns:
         Created or updated Integration model instance
     """
-    # Check if integration already exists
+    # An existing row holding the same secrets is returned as is, without
+    # encrypting anything or writing to the database
+    fingerprint = security.fingerprint_secrets(api_key, credentials)
     existing = get_integration(db, user_id, service_name)
+    if existing is not None and existing.secrets_fingerprint == fingerprint:
+        return existing
     
     # Encrypt sensitive data
-    encrypted_api_key = security.encrypt_token(api_key) if api_key else None
-    encrypted_creds = security.encrypt_credentials(credentials) if credentials else None
-    
-    if existing:
-        # Update existing integration
-        existing.encrypted_api_key = encrypted_api_key
-        existing.encrypted_credentials = encrypted_creds
-        db.commit()
-        db.refresh(existing)
-        return existing
+    encrypted_api_key, encrypted_creds = security.encrypt_integration_secrets(api_key, credentials)
+    values = {
+        "encrypted_api_key": encrypted_api_key,
+        "encrypted_credentials": encrypted_creds,
+        "secrets_fingerprint": fingerprint,
+    }
     
-    # Create new integration
-    db_integration = models.Integration(
+    # Insert or update in a single statement (ON CONFLICT on owner + service);
+    # both branches return the written row
+    stmt = _dialect_insert(db)(models.Integration).values(
+        owner_id=user_id,
         service_name=service_name.lower(),
-        encrypted_api_key=encrypted_api_key,
-        encrypted_credentials=encrypted_creds,
-        owner_id=user_id
+        **values
     )
-    db.add(db_integration)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["owner_id", "service_name"],
+        set_={**values, "updated_at": func.now()}
+    ).returning(models.Integration)
+    
+    db_integration = db.execute(
+        stmt,
+        execution_options={"populate_existing": True}
+    ).scalar_one()
     db.commit()
-    db.refresh(db_integration)
+    
+    invalidate_integration_secrets(user_id, service_name)
     return db_integration
 
 
+def upsert_integrations(
+    db: Session,
+    user_id: int,
+    service_names: list[str],
+    api_key: Optional[str] = None,
+    credentials: Optional[dict[str, Any]] = None
+) -> int:
+    """
+    Add or update several integrations sharing the same secrets in one statement.
+    
+    Used when one OAuth grant covers several services. The secrets are
+    encrypted once and written with a multi-row INSERT ... ON CONFLICT DO UPDATE;
+    rows already holding the same secrets are left untouched.
+    
+    Args:
+        db: Database session
+        user_id: Owner user ID
+        service_names: Services to connect (jira, gmail, etc.)
+        api_key: Optional API key (will be encrypted)
+        credentials: Optional OAuth/complex credentials (will be encrypted)
+        
+    Returns:
+        Number of integrations inserted or updated
+    """
+    if not service_names:
+        return 0
+    
+    encrypted_api_key, encrypted_creds = security.encrypt_integration_secrets(api_key, credentials)
+    fingerprint = security.fingerprint_secrets(api_key, credentials)
+    
+    stmt = _dialect_insert(db)(models.Integration).values([
+        {
+            "owner_id": user_id,
+            "service_name": service_name.lower(),
+            "encrypted_api_key": encrypted_api_key,
+            "encrypted_credentials": encrypted_creds,
+            "secrets_fingerprint": fingerprint,
+        }
+        for service_name in service_names
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["owner_id", "service_name"],
+        set_={
+            "encrypted_api_key": stmt.excluded.encrypted_api_key,
+            "encrypted_credentials": stmt.excluded.encrypted_credentials,
+            "secrets_fingerprint": stmt.excluded.secrets_fingerprint,
+            "updated_at": func.now(),
+        },
+        where=models.Integration.secrets_fingerprint.is_distinct_from(stmt.excluded.secrets_fingerprint)
+    ).returning(models.Integration.service_name)
+    
+    written = db.execute(stmt).scalars().all()
+    db.commit()
+    
+    for service_name in written:
+        invalidate_integration_secrets(user_id, service_name)
+    return len(written)
+
+
 def get_integration_key(
     db: Session, 
     user_id: int, 
-    service_name: str
+    service_name: str,
+    integration: Optional[models.Integration] = None
 ) -> Optional[str]:
     """
     Get decrypted API key for a service.
@@ -218,20 +412,25 @@ def get_integration_key(
         db: Database session
         user_id: Owner user ID
         service_name: Name of the service
+        integration: Already-loaded integration row, to skip the lookup
         
     Returns:
         Decrypted API key or None if not found
     """
-    integration = get_integration(db, user_id, service_name)
+    if integration is None:
+        integration = get_integration(db, user_id, service_name)
     if not integration or not integration.encrypted_api_key:
         return None
-    return security.decrypt_token(integration.encrypted_api_key)
+    return _decrypt_cached(
+        user_id, integration.service_name, integration.encrypted_api_key, security.decrypt_token
+    )
 
 
 def get_integration_credentials(
     db: Session, 
     user_id: int, 
-    service_name: str
+    service_name: str,
+    integration: Optional[models.Integration] = None
 ) -> Optional[dict[str, Any]]:
     """
     Get decrypted credentials for a service.
@@ -240,14 +439,52 @@ def get_integration_credentials(
         db: Database session
         user_id: Owner user ID
         service_name: Name of the service
+        integration: Already-loaded integration row, to skip the lookup
         
     Returns:
         Decrypted credentials dict or None if not found
     """
-    integration = get_integration(db, user_id, service_name)
+    if integration is None:
+        integration = get_integration(db, user_id, service_name)
     if not integration or not integration.encrypted_credentials:
         return None
-    return security.decrypt_credentials(integration.encrypted_credentials)
+    credentials = _decrypt_cached(
+        user_id, integration.service_name, integration.encrypted_credentials, security.decrypt_credentials
+    )
+    # Tools mutate credentials in place (e.g. refreshed tokens); keep the cached copy intact
+    return dict(credentials)
+
+
+def get_integration_configs(db: Session, user_id: int) -> dict[str, dict[str, Any]]:
+    """
+    Get decrypted secrets for all of a user's integrations in one query.
+    
+    Args:
+        db: Database session
+        user_id: Owner user ID
+        
+    Returns:
+        Map of service name to {"api_key": ..., "credentials": ...}, holding only
+        the parts that are set; services with no secrets are left out
+    """
+    integration_configs: dict[str, dict[str, Any]] = {}
+    for service_name, encrypted_api_key, encrypted_credentials in db.execute(
+        _integration_secrets_by_owner, {"user_id": user_id}
+    ):
+        config: dict[str, Any] = {}
+        if encrypted_api_key:
+            config["api_key"] = _decrypt_cached(
+                user_id, service_name, encrypted_api_key, security.decrypt_token
+            )
+        if encrypted_credentials:
+            credentials = _decrypt_cached(
+                user_id, service_name, encrypted_credentials, security.decrypt_credentials
+            )
+            if credentials:
+                config["credentials"] = dict(credentials)
+        if config:
+            integration_configs[service_name] = config
+    return integration_configs
 
 
 def delete_integration(db: Session, user_id: int, service_name: str) -> bool:
@@ -257,13 +494,10 @@ def delete_integration(db: Session, user_id: int, service_name: str) -> bool:
         return False
     db.delete(integration)
     db.commit()
+    invalidate_integration_secrets(user_id, service_name)
     return True
 
 
-# Alias for OAuth router compatibility
-get_user_integration = get_integration
-
-
 def update_integration_credentials(
     db: Session,
     integration_id: int,
@@ -280,16 +514,29 @@ def update_integration_credentials(
     Returns:
         True if updated, False if not found
     """
-    integration = db.query(models.Integration).filter(
-        models.Integration.id == integration_id
-    ).first()
+    integration = db.get(models.Integration, integration_id)
     
     if not integration:
         return False
     
+    # Skip the encryption and the write when the credentials did not change
+    api_key = None
+    if integration.encrypted_api_key:
+        api_key = _decrypt_cached(
+            integration.owner_id,
+            integration.service_name,
+            integration.encrypted_api_key,
+            security.decrypt_token
+        )
+    fingerprint = security.fingerprint_secrets(api_key, credentials)
+    if integration.secrets_fingerprint == fingerprint:
+        return True
+    
     encrypted_creds = security.encrypt_credentials(credentials) if credentials else None
     integration.encrypted_credentials = encrypted_creds
+    integration.secrets_fingerprint = fingerprint
     db.commit()
+    invalidate_integration_secrets(integration.owner_id, integration.service_name)
     return True
 
 
@@ -307,22 +554,92 @@ def create_conversation(
     )
     db.add(db_conversation)
     db.commit()
-    db.refresh(db_conversation)
     return db_conversation
 
 
 def get_conversation(db: Session, conversation_id: int) -> Optional[models.Conversation]:
-    """Get a conversation by ID."""
-    return db.query(models.Conversation).filter(
-        models.Conversation.id == conversation_id
+    """Get a conversation by ID (served from the session identity map when already loaded)."""
+    return db.get(models.Conversation, conversation_id)
+
+
+def get_conversation_owner(db: Session, conversation_id: int) -> Optional[int]:
+    """Get a conversation's owner ID without loading the row."""
+    return db.execute(_conversation_owner, {"conversation_id": conversation_id}).scalar()
+
+
+def load_chat_context(
+    db: Session,
+    user_id: int,
+    conversation_id: Optional[int] = None
+) -> tuple[Optional[models.User], Optional[models.Conversation]]:
+    """
+    Load a chat request's user and (optionally) conversation in one query.
+    
+    Args:
+        db: Database session
+        user_id: User ID
+        conversation_id: Conversation to continue, if any
+        
+    Returns:
+        (user, conversation); user is None if not found, conversation is None if
+        not requested or not found. Ownership is left to the caller to check.
+    """
+    if not conversation_id:
+        return get_user_by_id(db, user_id), None
+    
+    row = db.execute(
+        select(models.User, models.Conversation)
+        .outerjoin(models.Conversation, models.Conversation.id == conversation_id)
+        .where(models.User.id == user_id)
     ).first()
+    if row is None:
+        return None, None
+    return row[0], row[1]
 
 
-def get_user_conversations(db: Session, user_id: int) -> list[models.Conversation]:
-    """Get all conversations for a user, ordered by most recent first."""
-    return db.query(models.Conversation).filter(
-        models.Conversation.owner_id == user_id
-    ).order_by(models.Conversation.updated_at.desc().nullsfirst(), models.Conversation.created_at.desc()).all()
+def get_user_conversations(
+    db: Session,
+    user_id: int,
+    *,
+    limit: Optional[int] = None,
+    before: Optional[tuple[datetime, int]] = None
+) -> list[Row]:
+    """
+    Get a page of a user's conversations, ordered by most recent activity first.
+    
+    Args:
+        db: Database session
+        user_id: Owner user ID
+        limit: Maximum number of conversations to return (all if None)
+        before: Keyset cursor (last activity, id) of the previous page's last row
+        
+    Returns:
+        Rows with the conversation list columns (id, title, owner_id, created_at, updated_at)
+    """
+    last_activity = func.coalesce(models.Conversation.updated_at, models.Conversation.created_at)
+    query = db.query(
+        models.Conversation.id,
+        models.Conversation.title,
+        models.Conversation.owner_id,
+        models.Conversation.created_at,
+        models.Conversation.updated_at,
+    ).filter(models.Conversation.owner_id == user_id)
+    if before is not None:
+        activity, last_id = before
+        if db.get_bind().dialect.name == "sqlite":
+            # SQLite keeps CURRENT_TIMESTAMP as naive UTC text without microseconds
+            if activity.tzinfo is not None:
+                activity = activity.astimezone(timezone.utc).replace(tzinfo=None)
+            activity = literal(activity.strftime("%Y-%m-%d %H:%M:%S"), String)
+        # Rows sharing the cursor's timestamp continue by id, matching the ORDER BY
+        query = query.filter(or_(
+            last_activity < activity,
+            and_(last_activity == activity, models.Conversation.id < last_id)
+        ))
+    query = query.order_by(last_activity.desc(), models.Conversation.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
 
 
 def update_conversation_title(
@@ -331,23 +648,22 @@ def update_conversation_title(
     title: str
 ) -> Optional[models.Conversation]:
     """Update a conversation's title."""
-    conversation = get_conversation(db, conversation_id)
-    if not conversation:
-        return None
-    conversation.title = title
+    conversation = db.execute(
+        update(models.Conversation)
+        .where(models.Conversation.id == conversation_id)
+        .values(title=title, updated_at=func.now())
+        .returning(models.Conversation),
+        execution_options={"populate_existing": True}
+    ).scalar_one_or_none()
     db.commit()
-    db.refresh(conversation)
     return conversation
 
 
 def delete_conversation(db: Session, conversation_id: int) -> bool:
-    """Delete a conversation and all its messages."""
-    conversation = get_conversation(db, conversation_id)
-    if not conversation:
-        return False
-    db.delete(conversation)
+    """Delete a conversation; its messages go with it via ON DELETE CASCADE."""
+    result = db.execute(delete(models.Conversation).where(models.Conversation.id == conversation_id))
     db.commit()
-    return True
+    return result.rowcount > 0
 
 
 # ============== Message Operations ==============
@@ -368,12 +684,67 @@ def add_message(
     )
     db.add(db_message)
     db.commit()
-    db.refresh(db_message)
     return db_message
 
 
-def get_conversation_messages(db: Session, conversation_id: int) -> list[models.Message]:
-    """Get all messages for a conversation, ordered by creation time."""
-    return db.query(models.Message).filter(
-        models.Message.conversation_id == conversation_id
-    ).order_by(models.Message.created_at).all()
+def add_messages(
+    db: Session,
+    conversation_id: int,
+    messages: list[tuple[str, str, Optional[str]]]
+) -> None:
+    """
+    Add several messages to a conversation in one INSERT and one commit.
+    
+    Args:
+        db: Database session
+        conversation_id: Conversation ID
+        messages: (role, content, actions_json) tuples, in conversation order
+    """
+    if not messages:
+        return
+    
+    db.execute(
+        insert(models.Message),
+        [
+            {
+                "conversation_id": conversation_id,
+                "role": role,
+                "content": content,
+                "actions_json": actions_json
+            }
+            for role, content, actions_json in messages
+        ]
+    )
+    db.commit()
+
+
+def get_conversation_messages(
+    db: Session,
+    conversation_id: int,
+    *,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None
+) -> Iterable[Row]:
+    """
+    Stream the messages of a conversation, ordered by creation time.
+    
+    Yields lightweight rows (id, conversation_id, role, content, actions_json,
+    created_at) fetched in batches instead of materializing ORM objects; on
+    PostgreSQL this uses a server-side cursor.
+    
+    Args:
+        db: Database session
+        conversation_id: Conversation ID
+        after_id: Only return messages after this message ID (pagination cursor)
+        limit: Maximum number of messages to return (all when None)
+    """
+    stmt = _conversation_messages
+    params: dict[str, Any] = {"conversation_id": conversation_id}
+    if after_id is not None:
+        stmt = stmt + (lambda s: s.where(models.Message.id > bindparam("after_id")))
+        params["after_id"] = after_id
+    if limit is not None:
+        stmt = stmt + (lambda s: s.limit(bindparam("limit")))
+        params["limit"] = limit
+    
+    return db.execute(stmt, params, execution_options={"yield_per": 200})
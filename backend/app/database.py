@@ -4,7 +4,7 @@ SQLAlchemy engine and session setup for PostgreSQL/SQLite
 """
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 
@@ -22,10 +22,32 @@ if DATABASE_URL.startswith("sqlite"):
         DATABASE_URL,
         connect_args={"check_same_thread": False}
     )
+    
+    # Per-connection settings:
+    # - foreign_keys: SQLite ignores foreign keys (and so ON DELETE CASCADE) unless enabled
+    # - journal_mode=WAL: readers no longer block the single writer, or the writer them
+    # - busy_timeout: concurrent writers (handlers run DB work in worker threads) wait
+    #   for the write lock instead of failing with "database is locked"
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '15000'))}")
+        cursor.close()
 else:
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    # Route handlers run sync DB work in worker threads, so size the pool for
+    # concurrent requests rather than SQLAlchemy's default of 5
+    engine = create_engine(
+        DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay loaded after commit; INSERTs fetch server defaults (id, created_at)
+# with RETURNING during the flush, so no refresh SELECT is needed.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
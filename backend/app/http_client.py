@@ -0,0 +1,40 @@
+"""
+Shared HTTP Client
+One pooled async client for outbound calls made from request handlers
+"""
+
+from typing import Optional
+import httpx
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client, creating it on first use.
+    
+    Keeps TLS connections to token endpoints alive between requests instead of
+    handshaking on every call.
+    """
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=_HTTP2,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100)
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client's connections (called on app shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -3,7 +3,7 @@ Database Models
 SQLAlchemy ORM models for User and Integration tables
 """
 
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, LargeBinary, ForeignKey, DateTime, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -19,7 +19,7 @@ class User(Base):
     email = Column(String(255), unique=True, index=True, nullable=False)
     name = Column(String(255), nullable=True)
     hashed_password = Column(String(255), nullable=False)
-    encrypted_gemini_key = Column(Text, nullable=True)  # User's own Gemini API key (encrypted)
+    encrypted_gemini_key = Column(LargeBinary, nullable=True)  # User's own Gemini API key (encrypted)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -36,11 +36,16 @@ class Integration(Base):
     """Third-party service integration model."""
     
     __tablename__ = "integrations"
+    __table_args__ = (
+        # One integration per service per user; also the conflict target for upserts
+        UniqueConstraint("owner_id", "service_name", name="uq_integrations_owner_service"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    service_name = Column(String(50), nullable=False, index=True)  # jira, gmail, slack, notion, calendar
-    encrypted_api_key = Column(Text, nullable=True)  # For simple API key auth
-    encrypted_credentials = Column(Text, nullable=True)  # For OAuth/complex credentials (JSON)
+    service_name = Column(String(50), nullable=False)  # jira, gmail, slack, notion, calendar
+    encrypted_api_key = Column(LargeBinary, nullable=True)  # For simple API key auth
+    encrypted_credentials = Column(LargeBinary, nullable=True)  # For OAuth/complex credentials (JSON)
+    secrets_fingerprint = Column(String(32), nullable=True)  # Keyed hash of the plaintext, to skip no-op writes
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -48,7 +53,8 @@ class Integration(Base):
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     # Relationship: Integration belongs to User
-    owner = relationship("User", back_populates="integrations")
+    # Never lazy-load the owner (e.g. during response validation); use an explicit loader option
+    owner = relationship("User", back_populates="integrations", lazy="raise_on_sql")
 
     def __repr__(self) -> str:
         return f"<Integration(id={self.id}, service={self.service_name}, owner_id={self.owner_id})>"
@@ -58,6 +64,14 @@ class Conversation(Base):
     """Chat conversation model."""
     
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Matches get_user_conversations: filter by owner, ordered by last activity then id.
+        # Indexes the coalesce expression itself so the ORDER BY and cursor can use it.
+        Index(
+            "ix_conversations_owner_activity",
+            "owner_id", text("coalesce(updated_at, created_at)"), "id"
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False, default="New Chat")
@@ -69,7 +83,13 @@ class Conversation(Base):
 
     # Relationships
     owner = relationship("User", back_populates="conversations")
-    messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan", order_by="Message.created_at")
+    messages = relationship(
+        "Message",
+        back_populates="conversation",
+        cascade="all, delete-orphan",
+        passive_deletes=True,  # Messages are removed by the FK's ON DELETE CASCADE
+        order_by="Message.created_at"
+    )
 
     def __repr__(self) -> str:
         return f"<Conversation(id={self.id}, title={self.title}, owner_id={self.owner_id})>"
@@ -79,6 +99,10 @@ class Message(Base):
     """Chat message model."""
     
     __tablename__ = "messages"
+    __table_args__ = (
+        # Matches get_conversation_messages: filter by conversation, oldest first
+        Index("ix_messages_conversation_created", "conversation_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     role = Column(String(20), nullable=False)  # "user" or "assistant"
@@ -87,7 +111,7 @@ class Message(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Foreign Key to Conversation
-    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)
+    conversation_id = Column(Integer, ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
 
     # Relationship
     conversation = relationship("Conversation", back_populates="messages")
@@ -0,0 +1,75 @@
+"""
+OAuth State Store
+Short-lived CSRF state for OAuth flows, kept in Redis when configured
+"""
+
+import hashlib
+import os
+from typing import Any, Optional
+import orjson
+
+from app.cache import TTLCache
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+# How long a user has to complete the provider's consent screen
+STATE_TTL_SECONDS = 600
+
+_redis = None
+if REDIS_URL:
+    try:
+        import redis.asyncio as redis_asyncio
+        _redis = redis_asyncio.from_url(REDIS_URL)
+    except ImportError:
+        print("WARNING: REDIS_URL is set but the redis package is not installed; OAuth state is kept in memory.")
+
+# Single-process fallback; only works when callbacks reach the worker that started the flow
+_local_states = TTLCache(maxsize=10_000, ttl=STATE_TTL_SECONDS)
+
+
+def _digest(state: str) -> bytes:
+    # Tokens are stored by hash: fixed 32-byte keys whatever the token length,
+    # and the raw token never sits in the store
+    return hashlib.sha256(state.encode()).digest()
+
+
+def _redis_key(provider: str, state: str) -> str:
+    # Namespaced per provider so one flow's state cannot complete another's callback
+    return f"oauth_state:{provider}:{_digest(state).hex()}"
+
+
+async def save_state(provider: str, state: str, data: dict[str, Any]) -> None:
+    """Store the data for a new OAuth state token; it expires after STATE_TTL_SECONDS."""
+    if _redis is not None:
+        await _redis.set(_redis_key(provider, state), orjson.dumps(data), ex=STATE_TTL_SECONDS)
+    else:
+        _local_states.set((provider, _digest(state)), data)
+
+
+async def pop_state(provider: str, state: str) -> Optional[dict[str, Any]]:
+    """
+    Consume an OAuth state token.
+
+    Args:
+        provider: OAuth provider the flow was started for ("google", "linear")
+        state: State token returned to the callback
+
+    Returns:
+        The data stored with the state, or None if it is unknown, expired or
+        already used
+    """
+    if _redis is not None:
+        raw = await _redis.getdel(_redis_key(provider, state))
+        return orjson.loads(raw) if raw is not None else None
+
+    key = (provider, _digest(state))
+    data = _local_states.get(key)
+    if data is not None:
+        _local_states.pop(key)
+    return data
+
+
+async def close() -> None:
+    """Close the Redis connection pool, if one was opened."""
+    if _redis is not None:
+        await _redis.aclose()
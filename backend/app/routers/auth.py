@@ -3,33 +3,65 @@ Authentication Router
 Endpoints for user signup, login, and integration connection
 """
 
+import asyncio
+import json
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 
-from app import schemas, crud, security
+from app import schemas, crud, security, models
 from app.database import get_db
 
 router = APIRouter()
 
+# Built once; unknown services get a 400 with this as a plain-string detail
+_INVALID_SERVICE_ERR = f"Invalid service. Must be one of: {', '.join(sorted(schemas.VALID_SERVICES))}"
+
+
+def _user_response(user: models.User, token: Optional[str] = None) -> schemas.UserResponse:
+    """Build a UserResponse from a trusted DB row without re-running validation."""
+    return schemas.UserResponse.model_construct(
+        id=user.id,
+        email=user.email,
+        name=user.name,
+        created_at=user.created_at,
+        token=token,
+    )
+
+
+def _integration_response(integration: models.Integration) -> schemas.IntegrationResponse:
+    """Build an IntegrationResponse from a trusted DB row without re-running validation."""
+    return schemas.IntegrationResponse.model_construct(
+        id=integration.id,
+        service_name=integration.service_name,
+        owner_id=integration.owner_id,
+        created_at=integration.created_at,
+    )
+
+
+# Static payload, serialized once at import
+_SIGNUP_INFO_JSON = json.dumps({
+    "message": "Use POST /auth/signup with JSON body to create a user.",
+    "expected_body": {
+        "email": "user@example.com",
+        "password": "your-password",
+        "name": "Your Name",
+    },
+}).encode()
+
 
 @router.get(
     "/signup",
     summary="Signup endpoint info",
 )
-async def signup_info() -> dict[str, str]:
+async def signup_info() -> Response:
     """
     Informational endpoint for browser visits.
 
     Explains how to use the POST /auth/signup endpoint.
     """
-    return {
-        "message": "Use POST /auth/signup with JSON body to create a user.",
-        "expected_body": {
-            "email": "user@example.com",
-            "password": "your-password",
-            "name": "Your Name",
-        },
-    }
+    return Response(content=_SIGNUP_INFO_JSON, media_type="application/json")
 
 
 @router.post(
@@ -49,15 +81,15 @@ async def signup(
     - **password**: Password (minimum 6 characters)
     """
     # Check if user already exists
-    existing_user = crud.get_user_by_email(db, user.email)
-    if existing_user:
+    if await asyncio.to_thread(crud.email_exists, db, user.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Create user
-    db_user = crud.create_user(db, user)
+    # Create user (bcrypt hashing runs on its own worker pool, off the event loop)
+    hashed_password = await security.get_password_hash_async(user.password)
+    db_user = await asyncio.to_thread(crud.create_user, db, user, hashed_password)
     
     # Generate JWT token
     token = security.create_access_token(
@@ -66,9 +98,7 @@ async def signup(
         name=db_user.name
     )
     
-    response = schemas.UserResponse.model_validate(db_user)
-    response.token = token
-    return response
+    return _user_response(db_user, token)
 
 
 @router.post(
@@ -85,8 +115,12 @@ async def login(
     
     Returns user info on success.
     """
-    user = crud.authenticate_user(db, credentials.email, credentials.password)
-    if not user:
+    user = await asyncio.to_thread(crud.get_user_by_email, db, credentials.email)
+    
+    # Always run the verify so unknown emails are not distinguishable by timing
+    hashed_password = user.hashed_password if user else security.DUMMY_PASSWORD_HASH
+    password_ok = await security.verify_password_async(credentials.password, hashed_password)
+    if not user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -100,9 +134,7 @@ async def login(
         remember_me=credentials.remember_me
     )
     
-    response = schemas.UserResponse.model_validate(user)
-    response.token = token
-    return response
+    return _user_response(user, token)
 
 
 @router.put(
@@ -121,7 +153,7 @@ async def update_user(
     Allows updating name, email, or password.
     """
     # Check if user exists
-    user = crud.get_user_by_id(db, user_id)
+    user = await asyncio.to_thread(crud.get_user_by_id, db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -130,15 +162,18 @@ async def update_user(
         
     # If email is being changed, check if new email is already taken
     if user_update.email and user_update.email != user.email:
-        existing_user = crud.get_user_by_email(db, user_update.email)
-        if existing_user:
+        if await asyncio.to_thread(crud.email_exists, db, user_update.email):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
     
-    updated_user = crud.update_user(db, user_id, user_update)
-    return schemas.UserResponse.model_validate(updated_user)
+    hashed_password = None
+    if user_update.password is not None:
+        hashed_password = await security.get_password_hash_async(user_update.password)
+    
+    updated_user = await asyncio.to_thread(crud.update_user, db, user_id, user_update, hashed_password)
+    return _user_response(updated_user)
 
 
 @router.post(
@@ -161,31 +196,29 @@ async def connect_integration(
     - **slack**: Requires `api_key` (Bot token)
     - **notion**: Requires `api_key` (Integration token)
     """
-    # Validate user exists
-    user = crud.get_user_by_id(db, integration.user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    # Validate service name
-    valid_services = {"jira", "gmail", "calendar", "slack", "notion", "bugasura", "github", "docs", "sheets", "slides", "drive", "forms", "meet", "linear"}
-    if integration.service_name.lower() not in valid_services:
+    # Validate service name and credentials (before touching the database)
+    if integration.service_name not in schemas.VALID_SERVICES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid service. Must be one of: {', '.join(sorted(valid_services))}"
+            detail=_INVALID_SERVICE_ERR
         )
     
-    # Validate credentials provided
     if not integration.api_key and not integration.credentials:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Either api_key or credentials must be provided"
         )
     
-    # Store integration with encryption
-    db_integration = crud.add_integration(
+    # Validate user exists; the upsert below needs no separate lookup of the integration
+    if not await asyncio.to_thread(crud.user_exists, db, integration.user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    # Store integration with encryption, off the event loop
+    db_integration = await asyncio.to_thread(
+        crud.add_integration,
         db=db,
         user_id=integration.user_id,
         service_name=integration.service_name,
@@ -193,7 +226,7 @@ async def connect_integration(
         credentials=integration.credentials
     )
     
-    return schemas.IntegrationResponse.model_validate(db_integration)
+    return _integration_response(db_integration)
 
 
 @router.get(
@@ -206,21 +239,17 @@ async def list_integrations(
     db: Session = Depends(get_db)
 ) -> schemas.IntegrationList:
     """Get all connected integrations for a user."""
-    # Validate user exists
-    user = crud.get_user_by_id(db, user_id)
-    if not user:
+    integrations = await asyncio.to_thread(crud.get_user_integrations, db, user_id)
+    
+    # Integrations imply an existing owner; only probe the user when there are none
+    if not integrations and not await asyncio.to_thread(crud.user_exists, db, user_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    integrations = crud.get_user_integrations(db, user_id)
-    return schemas.IntegrationList(
-        integrations=[
-            schemas.IntegrationResponse.model_validate(i) for i in integrations
-        ],
-        total=len(integrations)
-    )
+    items = [_integration_response(integration) for integration in integrations]
+    return schemas.IntegrationList.model_construct(integrations=items, total=len(items))
 
 
 @router.delete(
@@ -234,7 +263,7 @@ async def disconnect_integration(
     db: Session = Depends(get_db)
 ) -> None:
     """Remove a connected integration."""
-    success = crud.delete_integration(db, user_id, service_name)
+    success = await asyncio.to_thread(crud.delete_integration, db, user_id, service_name)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
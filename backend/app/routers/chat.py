@@ -3,17 +3,114 @@ Chat Router
 Natural language command processing via LangChain agent
 """
 
+import asyncio
 import json
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+import logging
+from typing import Any, Optional
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
 
 from app import schemas, crud
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.services.agent import process_chat_message, process_chat_message_streaming
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
+
+def _sse_event(event: dict) -> bytes:
+    """Encode an event as an SSE data frame."""
+    return b"data: " + orjson.dumps(event, option=orjson.OPT_NON_STR_KEYS) + b"\n\n"
+
+
+def _sse_frame(message: str, conversation_id: Optional[int] = None) -> bytes:
+    """Format an SSE error event."""
+    data: dict = {"message": message}
+    if conversation_id is not None:
+        data["conversation_id"] = conversation_id
+    return _sse_event({"event_type": "error", "data": data})
+
+
+# Error messages shared by both chat endpoints
+_ERR_USER_NOT_FOUND = "User not found"
+_ERR_CONVERSATION_NOT_FOUND = "Conversation not found"
+_ERR_CONVERSATION_FORBIDDEN = "Conversation does not belong to user"
+_ERR_NO_INTEGRATIONS = "No integrations connected. Please connect at least one service first."
+_ERR_NO_GEMINI_KEY = "Gemini API Key is required. Please set it in Settings."
+
+# Pre-encoded SSE frames for the validation errors
+_SSE_ERRORS = {
+    message: _sse_frame(message)
+    for message in (
+        _ERR_USER_NOT_FOUND,
+        _ERR_CONVERSATION_NOT_FOUND,
+        _ERR_CONVERSATION_FORBIDDEN,
+        _ERR_NO_INTEGRATIONS,
+        _ERR_NO_GEMINI_KEY,
+    )
+}
+
+
+def _sse_error(message: str) -> Response:
+    """Return a one-event SSE error response."""
+    body = _SSE_ERRORS.get(message) or _sse_frame(message)
+    return Response(content=body, media_type="text/event-stream")
+
+
+def _save_messages(conversation_id: int, messages: list[tuple[str, str, Optional[str]]]) -> None:
+    """Persist messages with their own session, for writes that run after the response."""
+    db = SessionLocal()
+    try:
+        crud.add_messages(db, conversation_id, messages)
+    except Exception:
+        # Nothing is left to report the failure to once the response is sent
+        logger.exception("Failed to save messages for conversation %s", conversation_id)
+    finally:
+        db.close()
+
+
+_TITLE_MAX_CHARS = 50
+
+
+def _make_title(message: str) -> str:
+    """Build a conversation title from the first message, truncated with an ellipsis."""
+    if len(message) <= _TITLE_MAX_CHARS:
+        return message
+    return message[:_TITLE_MAX_CHARS].rstrip() + "\u2026"
+
+
+def _load_integration_configs(user_id: int) -> dict[str, dict[str, Any]]:
+    """Get a user's integration configs with their own session, so the lookup can overlap other work."""
+    db = SessionLocal()
+    try:
+        return crud.get_integration_configs(db, user_id)
+    finally:
+        db.close()
+
+
+def _prefetch_integration_configs(user_id: int) -> asyncio.Task:
+    """Start loading a user's integration configs in a worker thread."""
+    task = asyncio.create_task(asyncio.to_thread(_load_integration_configs, user_id))
+    # Requests that bail out early never await the task; consume its outcome so
+    # a failure is not reported as "exception was never retrieved"
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return task
+
+
+# Strong references to detached writes, so they are not garbage collected mid-flight
+_pending_writes: set[asyncio.Task] = set()
+
+
+def _spawn_write(func, *args) -> None:
+    """Run a blocking write in a worker thread, detached from the current request."""
+    task = asyncio.create_task(asyncio.to_thread(func, *args))
+    _pending_writes.add(task)
+    task.add_done_callback(_pending_writes.discard)
+
 
 @router.post(
     "/chat",
@@ -22,8 +119,9 @@ router = APIRouter()
 )
 async def chat(
     request: schemas.ChatRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
-) -> schemas.ChatResponse:
+) -> Response:
     """
     Process a natural language message and execute actions across integrated tools.
     
@@ -40,83 +138,61 @@ async def chat(
     3. Execute actions using connected tools
     4. Return structured results
     """
+    # Fetch integration secrets while the user and conversation are validated
+    configs_task = _prefetch_integration_configs(request.user_id)
+    
+    # Load the user and requested conversation in one query
+    user, conversation = await asyncio.to_thread(
+        crud.load_chat_context, db, request.user_id, request.conversation_id
+    )
+    
     # Validate user exists
-    user = crud.get_user_by_id(db, request.user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
+            detail=_ERR_USER_NOT_FOUND
         )
     
     # Get or create conversation
     conversation_id = request.conversation_id
     if conversation_id:
         # Validate conversation exists and belongs to user
-        conversation = crud.get_conversation(db, conversation_id)
         if not conversation:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Conversation not found"
+                detail=_ERR_CONVERSATION_NOT_FOUND
             )
         if conversation.owner_id != request.user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="Conversation does not belong to user"
+                detail=_ERR_CONVERSATION_FORBIDDEN
             )
     else:
         # Create new conversation with first few words of message as title
-        title = request.message[:50] + "..." if len(request.message) > 50 else request.message
-        conversation = crud.create_conversation(db, request.user_id, title)
+        title = _make_title(request.message)
+        conversation = await asyncio.to_thread(crud.create_conversation, db, request.user_id, title)
         conversation_id = conversation.id
     
-    # Save user message to database
-    crud.add_message(
-        db=db,
-        conversation_id=conversation_id,
-        role="user",
-        content=request.message
-    )
+    # Save the user message before answering, so a history reload always includes it
+    await asyncio.to_thread(crud.add_message, db, conversation_id, "user", request.message)
     
-    # Get user's connected integrations
-    integrations = crud.get_user_integrations(db, request.user_id)
-    if not integrations:
+    # Decrypted secrets for the user's connected integrations, fetched above
+    integration_configs = await configs_task
+    if not integration_configs:
         # Save error as assistant message
-        error_msg = "No integrations connected. Please connect at least one service first."
-        crud.add_message(
-            db=db,
-            conversation_id=conversation_id,
-            role="assistant",
-            content=error_msg
-        )
+        error_msg = _ERR_NO_INTEGRATIONS
+        await asyncio.to_thread(crud.add_message, db, conversation_id, "assistant", error_msg)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=error_msg
         )
     
-    # Build integration credentials map
-    integration_configs: dict[str, dict] = {}
-    for integration in integrations:
-        config = {}
-        
-        # Get decrypted API key
-        api_key = crud.get_integration_key(db, request.user_id, integration.service_name)
-        if api_key:
-            config["api_key"] = api_key
-        
-        # Get decrypted credentials
-        credentials = crud.get_integration_credentials(db, request.user_id, integration.service_name)
-        if credentials:
-            config["credentials"] = credentials
-        
-        if config:
-            integration_configs[integration.service_name] = config
-    
     # Get user's Gemini API key
-    gemini_api_key = crud.get_user_gemini_key(db, request.user_id)
+    gemini_api_key = await asyncio.to_thread(crud.get_user_gemini_key, db, request.user_id, user=user)
     if not gemini_api_key:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Gemini API Key is required. Please set it in Settings."
+            detail=_ERR_NO_GEMINI_KEY
         )
     
     try:
@@ -128,25 +204,24 @@ async def chat(
             smart_mode=request.smart_mode
         )
         
-        # Save assistant response to database
-        actions_json = None
-        if result.actions_taken:
-            actions_json = json.dumps([action.model_dump() for action in result.actions_taken])
+        # Save the assistant reply once the response has been sent
+        actions_taken = [action.model_dump() for action in result.actions_taken]
+        actions_json = orjson.dumps(actions_taken).decode() if actions_taken else None
         
-        crud.add_message(
-            db=db,
-            conversation_id=conversation_id,
-            role="assistant",
-            content=result.message,
-            actions_json=actions_json
+        background_tasks.add_task(
+            _save_messages, conversation_id, [("assistant", result.message, actions_json)]
         )
         
-        # Return response with conversation_id
-        return schemas.ChatResponse(
-            message=result.message,
-            actions_taken=result.actions_taken,
-            raw_response=result.raw_response,
-            conversation_id=conversation_id
+        # Return response with conversation_id; the agent result is already a
+        # validated ChatResponse, so it is encoded directly rather than re-validated
+        return Response(
+            content=orjson.dumps({
+                "message": result.message,
+                "actions_taken": actions_taken,
+                "raw_response": result.raw_response,
+                "conversation_id": conversation_id
+            }),
+            media_type="application/json"
         )
     except ValueError as e:
         # Specific integration not connected
@@ -176,106 +251,74 @@ async def chat_stream(
     Returns Server-Sent Events (SSE) for real-time progress:
     - planning: Initial analysis status
     - plan: Full task plan with all identified tasks
+    - token: Incremental answer text as the model generates it
     - task_started: When each task begins
     - task_completed: When each task finishes successfully
     - task_failed: When a task fails
     - complete: Final response with all results
     - error: If something goes wrong
     """
+    # Fetch integration secrets while the user and conversation are validated
+    configs_task = _prefetch_integration_configs(request.user_id)
+    
+    # Load the user and requested conversation in one query
+    user, conversation = await asyncio.to_thread(
+        crud.load_chat_context, db, request.user_id, request.conversation_id
+    )
+    
     # Validate user exists
-    user = crud.get_user_by_id(db, request.user_id)
     if not user:
-        async def error_generator():
-            yield f"data: {json.dumps({'event_type': 'error', 'data': {'message': 'User not found'}})}\n\n"
-        return StreamingResponse(
-            error_generator(),
-            media_type="text/event-stream"
-        )
+        return _sse_error(_ERR_USER_NOT_FOUND)
     
     # Get or create conversation
     conversation_id = request.conversation_id
     if conversation_id:
         # Validate conversation exists and belongs to user
-        conversation = crud.get_conversation(db, conversation_id)
         if not conversation:
-            async def error_generator():
-                yield f"data: {json.dumps({'event_type': 'error', 'data': {'message': 'Conversation not found'}})}\n\n"
-            return StreamingResponse(
-                error_generator(),
-                media_type="text/event-stream"
-            )
+            return _sse_error(_ERR_CONVERSATION_NOT_FOUND)
         if conversation.owner_id != request.user_id:
-            async def error_generator():
-                yield f"data: {json.dumps({'event_type': 'error', 'data': {'message': 'Conversation does not belong to user'}})}\n\n"
-            return StreamingResponse(
-                error_generator(),
-                media_type="text/event-stream"
-            )
+            return _sse_error(_ERR_CONVERSATION_FORBIDDEN)
     else:
         # Create new conversation with first few words of message as title
-        title = request.message[:50] + "..." if len(request.message) > 50 else request.message
-        conversation = crud.create_conversation(db, request.user_id, title)
+        title = _make_title(request.message)
+        conversation = await asyncio.to_thread(crud.create_conversation, db, request.user_id, title)
         conversation_id = conversation.id
     
-    # Save user message to database
-    crud.add_message(
-        db=db,
-        conversation_id=conversation_id,
-        role="user",
-        content=request.message
-    )
+    # Save the user message before answering, so a history reload always includes it
+    await asyncio.to_thread(crud.add_message, db, conversation_id, "user", request.message)
     
-    # Get user's connected integrations
-    integrations = crud.get_user_integrations(db, request.user_id)
-    if not integrations:
+    # Decrypted secrets for the user's connected integrations, fetched above
+    integration_configs = await configs_task
+    if not integration_configs:
         # Save error as assistant message
-        error_msg = "No integrations connected. Please connect at least one service first."
-        crud.add_message(
-            db=db,
-            conversation_id=conversation_id,
-            role="assistant",
-            content=error_msg
-        )
-        async def error_generator():
-            yield f"data: {json.dumps({'event_type': 'error', 'data': {'message': error_msg}})}\n\n"
-        return StreamingResponse(
-            error_generator(),
-            media_type="text/event-stream"
-        )
-    
-    # Build integration credentials map
-    integration_configs: dict[str, dict] = {}
-    for integration in integrations:
-        config = {}
-        
-        # Get decrypted API key
-        api_key = crud.get_integration_key(db, request.user_id, integration.service_name)
-        if api_key:
-            config["api_key"] = api_key
-        
-        # Get decrypted credentials
-        credentials = crud.get_integration_credentials(db, request.user_id, integration.service_name)
-        if credentials:
-            config["credentials"] = credentials
-        
-        if config:
-            integration_configs[integration.service_name] = config
+        error_msg = _ERR_NO_INTEGRATIONS
+        await asyncio.to_thread(crud.add_message, db, conversation_id, "assistant", error_msg)
+        return _sse_error(error_msg)
     
     # Get user's Gemini API key
-    gemini_api_key = crud.get_user_gemini_key(db, request.user_id)
+    gemini_api_key = await asyncio.to_thread(crud.get_user_gemini_key, db, request.user_id, user=user)
     if not gemini_api_key:
-        error_msg = "Gemini API Key is required. Please set it in Settings."
-        async def error_generator():
-            yield f"data: {json.dumps({'event_type': 'error', 'data': {'message': error_msg}})}\n\n"
-        return StreamingResponse(
-            error_generator(),
-            media_type="text/event-stream"
-        )
+        return _sse_error(_ERR_NO_GEMINI_KEY)
+    
+    # Assistant reply captured by the generator; it is written once, after the stream ends
+    reply: dict[str, Optional[str]] = {}
+    
+    def save_reply() -> None:
+        # pop() makes this single-shot when both the background task and the
+        # disconnect fallback below end up calling it
+        content = reply.pop("content", None)
+        if content is not None:
+            _save_messages(
+                conversation_id,
+                [("assistant", content, reply.pop("actions_json", None))]
+            )
     
     async def event_generator():
         """Generate SSE events from the streaming chat processor."""
         final_message = ""
+        streamed_text: list[str] = []
         actions_taken = []
+        finished = False
         
         try:
             async for event in process_chat_message_streaming(
@@ -284,7 +327,10 @@ async def chat_stream(
                 gemini_api_key=gemini_api_key
             ):
                 # Capture final message and actions from complete event
-                if event.get("event_type") == "complete":
+                event_type = event.get("event_type")
+                if event_type == "token":
+                    streamed_text.append(event["data"]["delta"])
+                elif event_type == "complete":
                     data = event.get("data", {})
                     final_message = data.get("message", "")
                     actions_taken = data.get("actions_taken", [])
@@ -294,35 +340,37 @@ async def chat_stream(
                     event["data"] = {}
                 event["data"]["conversation_id"] = conversation_id
                 
-                yield f"data: {json.dumps(event)}\n\n"
+                yield _sse_event(event)
             
-            # Save assistant response to database after streaming completes
-            actions_json = None
+            # Assistant response is saved after streaming completes
+            reply["content"] = final_message or "Task completed."
             if actions_taken:
-                actions_json = json.dumps(actions_taken)
-            
-            crud.add_message(
-                db=db,
-                conversation_id=conversation_id,
-                role="assistant",
-                content=final_message or "Task completed.",
-                actions_json=actions_json
-            )
+                reply["actions_json"] = orjson.dumps(actions_taken).decode()
+            finished = True
             
         except Exception as e:
             # Save error as assistant message
             error_msg = str(e)
-            crud.add_message(
-                db=db,
-                conversation_id=conversation_id,
-                role="assistant",
-                content=f"Error: {error_msg}"
-            )
-            yield f"data: {json.dumps({'event_type': 'error', 'data': {'message': error_msg, 'conversation_id': conversation_id}})}\n\n"
+            reply["content"] = f"Error: {error_msg}"
+            reply.pop("actions_json", None)
+            yield _sse_frame(error_msg, conversation_id)
+            finished = True
+        
+        finally:
+            if not finished:
+                # Client went away mid-stream: the generator is being closed or
+                # cancelled, and the response background task may never run.
+                # Keep whatever text was produced and write it detached.
+                reply.setdefault(
+                    "content",
+                    "".join(streamed_text) or "Error: Response interrupted before completion."
+                )
+                _spawn_write(save_reply)
     
     return StreamingResponse(
         event_generator(),
         media_type="text/event-stream",
+        background=BackgroundTask(save_reply),
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
@@ -331,53 +379,58 @@ async def chat_stream(
     )
 
 
+# Static payload, serialized once at import
+_SUPPORTED_COMMANDS = {
+    "services": {
+        "jira": {
+            "description": "Atlassian Jira for issue tracking",
+            "example_commands": [
+                "Create a Jira ticket for [issue description]",
+                "Search for Jira issues about [topic]",
+                "What are my open Jira tickets?"
+            ]
+        },
+        "gmail": {
+            "description": "Gmail for email management",
+            "example_commands": [
+                "Send an email to [recipient] about [subject]",
+                "Check my unread emails",
+                "Draft an email to [recipient]"
+            ]
+        },
+        "calendar": {
+            "description": "Google Calendar for scheduling",
+            "example_commands": [
+                "Schedule a meeting [when] with [who]",
+                "What's on my calendar today?",
+                "Create an event for [description] on [date]"
+            ]
+        },
+        "slack": {
+            "description": "Slack for team communication",
+            "example_commands": [
+                "Send '[message]' to #[channel]",
+                "Post an update to #[channel]",
+                "Message [person] on Slack"
+            ]
+        },
+        "notion": {
+            "description": "Notion for documentation",
+            "example_commands": [
+                "Search my Notion for [topic]",
+                "What's in my [page name] Notion page?",
+                "Find Notion docs about [subject]"
+            ]
+        }
+    }
+}
+_SUPPORTED_COMMANDS_JSON = json.dumps(_SUPPORTED_COMMANDS).encode()
+
+
 @router.get(
     "/supported-commands",
     summary="Get list of supported commands"
 )
-async def supported_commands() -> dict:
+async def supported_commands() -> Response:
     """Get examples of supported natural language commands."""
-    return {
-        "services": {
-            "jira": {
-                "description": "Atlassian Jira for issue tracking",
-                "example_commands": [
-                    "Create a Jira ticket for [issue description]",
-                    "Search for Jira issues about [topic]",
-                    "What are my open Jira tickets?"
-                ]
-            },
-            "gmail": {
-                "description": "Gmail for email management",
-                "example_commands": [
-                    "Send an email to [recipient] about [subject]",
-                    "Check my unread emails",
-                    "Draft an email to [recipient]"
-                ]
-            },
-            "calendar": {
-                "description": "Google Calendar for scheduling",
-                "example_commands": [
-                    "Schedule a meeting [when] with [who]",
-                    "What's on my calendar today?",
-                    "Create an event for [description] on [date]"
-                ]
-            },
-            "slack": {
-                "description": "Slack for team communication",
-                "example_commands": [
-                    "Send '[message]' to #[channel]",
-                    "Post an update to #[channel]",
-                    "Message [person] on Slack"
-                ]
-            },
-            "notion": {
-                "description": "Notion for documentation",
-                "example_commands": [
-                    "Search my Notion for [topic]",
-                    "What's in my [page name] Notion page?",
-                    "Find Notion docs about [subject]"
-                ]
-            }
-        }
-    }
+    return Response(content=_SUPPORTED_COMMANDS_JSON, media_type="application/json")
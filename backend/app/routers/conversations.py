@@ -3,16 +3,75 @@ Conversations Router
 Manage chat conversations and message history
 """
 
-import json
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from datetime import datetime
+from typing import Optional
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 
-from app import schemas, crud
+from app import schemas, crud, models
 from app.database import get_db
 
 router = APIRouter()
 
 
+def _conversation_response(conversation: models.Conversation) -> schemas.ConversationResponse:
+    """Build a ConversationResponse from a trusted DB row without re-running validation."""
+    return schemas.ConversationResponse.model_construct(
+        id=conversation.id,
+        title=conversation.title,
+        owner_id=conversation.owner_id,
+        created_at=conversation.created_at,
+        updated_at=conversation.updated_at,
+    )
+
+
+def _parse_cursor(cursor: str) -> tuple[datetime, int]:
+    """Split a next_cursor value into its (last activity, id) keyset."""
+    activity, _, last_id = cursor.rpartition(",")
+    try:
+        return datetime.fromisoformat(activity), int(last_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _message_rows(
+    db: Session,
+    conversation_id: int,
+    after_id: Optional[int],
+    limit: Optional[int]
+) -> list[dict]:
+    """Fetch a conversation's messages as response dicts (runs in a worker thread)."""
+    messages = crud.get_conversation_messages(db, conversation_id, after_id=after_id, limit=limit)
+    
+    # Stored actions are ActionResult dumps written by the chat endpoints, so the
+    # rows are encoded directly instead of being validated into MessageResponse
+    rows = []
+    for msg in messages:
+        actions_taken = None
+        if msg.actions_json:
+            try:
+                actions_taken = orjson.loads(msg.actions_json)
+            except orjson.JSONDecodeError:
+                actions_taken = None
+        
+        rows.append({
+            "id": msg.id,
+            "conversation_id": msg.conversation_id,
+            "role": msg.role,
+            "content": msg.content,
+            "actions_taken": actions_taken,
+            "created_at": msg.created_at
+        })
+    
+    return rows
+
+
 @router.post(
     "/conversations",
     response_model=schemas.ConversationResponse,
@@ -24,19 +83,19 @@ async def create_conversation(
 ) -> schemas.ConversationResponse:
     """Create a new conversation for a user."""
     # Validate user exists
-    user = crud.get_user_by_id(db, request.user_id)
-    if not user:
+    if not await asyncio.to_thread(crud.user_exists, db, request.user_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    conversation = crud.create_conversation(
+    conversation = await asyncio.to_thread(
+        crud.create_conversation,
         db=db,
         user_id=request.user_id,
         title=request.title or "New Chat"
     )
-    return conversation
+    return _conversation_response(conversation)
 
 
 @router.get(
@@ -46,21 +105,34 @@ async def create_conversation(
 )
 async def get_user_conversations(
     user_id: int,
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size (all conversations when omitted)"),
+    before: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
     db: Session = Depends(get_db)
 ) -> schemas.ConversationList:
-    """Get all conversations for a user, ordered by most recent."""
+    """Get a user's conversations, ordered by most recent; paged when `limit` is given."""
     # Validate user exists
-    user = crud.get_user_by_id(db, user_id)
-    if not user:
+    if not await asyncio.to_thread(crud.user_exists, db, user_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    conversations = crud.get_user_conversations(db, user_id)
-    return schemas.ConversationList(
-        conversations=conversations,
-        total=len(conversations)
+    cursor = _parse_cursor(before) if before else None
+    conversations = await asyncio.to_thread(
+        crud.get_user_conversations, db, user_id, limit=limit, before=cursor
+    )
+    
+    # A full page means there may be more; the cursor is the last row's (activity, id)
+    next_cursor = None
+    if limit is not None and len(conversations) == limit:
+        last = conversations[-1]
+        next_cursor = f"{(last.updated_at or last.created_at).isoformat()},{last.id}"
+    
+    items = [_conversation_response(conversation) for conversation in conversations]
+    return schemas.ConversationList.model_construct(
+        conversations=items,
+        total=len(items),
+        next_cursor=next_cursor
     )
 
 
@@ -71,38 +143,20 @@ async def get_user_conversations(
 )
 async def get_conversation_messages(
     conversation_id: int,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (all messages when omitted)"),
+    after: Optional[int] = Query(None, description="Return messages after this message ID"),
     db: Session = Depends(get_db)
-) -> list[schemas.MessageResponse]:
-    """Get all messages for a conversation."""
-    conversation = crud.get_conversation(db, conversation_id)
-    if not conversation:
+) -> Response:
+    """Get the messages of a conversation, oldest first."""
+    if await asyncio.to_thread(crud.get_conversation_owner, db, conversation_id) is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conversation not found"
         )
     
-    messages = crud.get_conversation_messages(db, conversation_id)
-    
-    # Convert messages to response format with parsed actions
-    result = []
-    for msg in messages:
-        actions_taken = None
-        if msg.actions_json:
-            try:
-                actions_taken = json.loads(msg.actions_json)
-            except json.JSONDecodeError:
-                actions_taken = None
-        
-        result.append(schemas.MessageResponse(
-            id=msg.id,
-            conversation_id=msg.conversation_id,
-            role=msg.role,
-            content=msg.content,
-            actions_taken=actions_taken,
-            created_at=msg.created_at
-        ))
+    rows = await asyncio.to_thread(_message_rows, db, conversation_id, after, limit)
     
-    return result
+    return Response(content=orjson.dumps(rows, option=orjson.OPT_UTC_Z), media_type="application/json")
 
 
 @router.put(
@@ -116,7 +170,8 @@ async def update_conversation(
     db: Session = Depends(get_db)
 ) -> schemas.ConversationResponse:
     """Update a conversation's title."""
-    conversation = crud.update_conversation_title(
+    conversation = await asyncio.to_thread(
+        crud.update_conversation_title,
         db=db,
         conversation_id=conversation_id,
         title=request.title
@@ -128,7 +183,7 @@ async def update_conversation(
             detail="Conversation not found"
         )
     
-    return conversation
+    return _conversation_response(conversation)
 
 
 @router.delete(
@@ -141,7 +196,7 @@ async def delete_conversation(
     db: Session = Depends(get_db)
 ):
     """Delete a conversation and all its messages."""
-    deleted = crud.delete_conversation(db, conversation_id)
+    deleted = await asyncio.to_thread(crud.delete_conversation, db, conversation_id)
     
     if not deleted:
         raise HTTPException(
@@ -3,21 +3,25 @@ Google OAuth Router
 Handles OAuth 2.0 authentication flow for Gmail and Google Calendar
 """
 
+import asyncio
+import logging
 import os
 import json
 import secrets
-from datetime import datetime, timedelta
+import time
 from urllib.parse import urlencode
 
 from fastapi import APIRouter, HTTPException, status, Depends, Query
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-import httpx
 
 from app.database import get_db
-from app import crud
+from app.http_client import get_http_client
+from app import crud, oauth_state
+from app.services import google_auth
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Google OAuth Configuration
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "")
@@ -60,19 +64,28 @@ SCOPES = {
     ],
 }
 
-# In-memory state storage (in production, use Redis or database)
-_oauth_states: dict[str, dict] = {}
+# Every service's scopes plus basic profile scopes, deduplicated once at import
+_ALL_GOOGLE_SCOPES: tuple[str, ...] = tuple(sorted(
+    {scope for service_scopes in SCOPES.values() for scope in service_scopes}
+    | {"openid", "https://www.googleapis.com/auth/userinfo.email"}
+))
 
 
-def get_all_google_scopes() -> list[str]:
-    """Get all Google scopes for both Gmail and Calendar."""
-    all_scopes = []
-    for service_scopes in SCOPES.values():
-        all_scopes.extend(service_scopes)
-    # Add basic profile scope
-    all_scopes.append("openid")
-    all_scopes.append("https://www.googleapis.com/auth/userinfo.email")
-    return list(set(all_scopes))
+def get_all_google_scopes() -> tuple[str, ...]:
+    """Get all Google scopes for every Google service."""
+    return _ALL_GOOGLE_SCOPES
+
+
+# Everything in the consent URL except the per-request state is fixed, so encode it once.
+# Request all Google scopes so the user only needs to auth once.
+_AUTH_QUERY = urlencode({
+    "client_id": GOOGLE_CLIENT_ID,
+    "redirect_uri": GOOGLE_REDIRECT_URI,
+    "response_type": "code",
+    "scope": " ".join(_ALL_GOOGLE_SCOPES),
+    "access_type": "offline",  # Get refresh token
+    "prompt": "consent",  # Force consent to get refresh token
+})
 
 
 @router.get(
@@ -107,27 +120,10 @@ async def google_oauth_start(
     state = secrets.token_urlsafe(32)
     
     # Store state with user info (expires in 10 minutes)
-    _oauth_states[state] = {
-        "user_id": user_id,
-        "service": service,
-        "created_at": datetime.utcnow().isoformat()
-    }
-    
-    # Build OAuth URL
-    # Request both Gmail and Calendar scopes so user only needs to auth once
-    scopes = get_all_google_scopes()
+    await oauth_state.save_state("google", state, {"user_id": user_id, "service": service})
     
-    params = {
-        "client_id": GOOGLE_CLIENT_ID,
-        "redirect_uri": GOOGLE_REDIRECT_URI,
-        "response_type": "code",
-        "scope": " ".join(scopes),
-        "state": state,
-        "access_type": "offline",  # Get refresh token
-        "prompt": "consent",  # Force consent to get refresh token
-    }
-    
-    auth_url = f"{GOOGLE_AUTH_URL}?{urlencode(params)}"
+    # Build OAuth URL (token_urlsafe output needs no escaping)
+    auth_url = f"{GOOGLE_AUTH_URL}?{_AUTH_QUERY}&state={state}"
     
     return RedirectResponse(url=auth_url)
 
@@ -159,45 +155,38 @@ async def google_oauth_callback(
             url=f"{FRONTEND_URL}/integrations?error=missing_params"
         )
     
-    # Validate state
-    if state not in _oauth_states:
+    # Validate state (single use; the store drops it after 10 minutes)
+    state_data = await oauth_state.pop_state("google", state)
+    if state_data is None:
         return RedirectResponse(
             url=f"{FRONTEND_URL}/integrations?error=invalid_state"
         )
     
-    state_data = _oauth_states.pop(state)
     user_id = state_data["user_id"]
     service = state_data["service"]
     
-    # Check if state is expired (10 minutes)
-    created_at = datetime.fromisoformat(state_data["created_at"])
-    if datetime.utcnow() - created_at > timedelta(minutes=10):
-        return RedirectResponse(
-            url=f"{FRONTEND_URL}/integrations?error=state_expired"
-        )
-    
-    # Exchange code for tokens
+    # Exchange code for tokens over the shared keep-alive client
+    http = get_http_client()
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                GOOGLE_TOKEN_URL,
-                data={
-                    "client_id": GOOGLE_CLIENT_ID,
-                    "client_secret": GOOGLE_CLIENT_SECRET,
-                    "code": code,
-                    "grant_type": "authorization_code",
-                    "redirect_uri": GOOGLE_REDIRECT_URI,
-                }
+        response = await http.post(
+            GOOGLE_TOKEN_URL,
+            data={
+                "client_id": GOOGLE_CLIENT_ID,
+                "client_secret": GOOGLE_CLIENT_SECRET,
+                "code": code,
+                "grant_type": "authorization_code",
+                "redirect_uri": GOOGLE_REDIRECT_URI,
+            }
+        )
+        
+        if response.status_code != 200:
+            error_detail = response.json().get("error_description", "Token exchange failed")
+            return RedirectResponse(
+                url=f"{FRONTEND_URL}/integrations?error={error_detail}"
             )
-            
-            if response.status_code != 200:
-                error_detail = response.json().get("error_description", "Token exchange failed")
-                return RedirectResponse(
-                    url=f"{FRONTEND_URL}/integrations?error={error_detail}"
-                )
-            
-            tokens = response.json()
-            
+        
+        tokens = response.json()
+        
     except Exception as e:
         return RedirectResponse(
             url=f"{FRONTEND_URL}/integrations?error=token_exchange_failed"
@@ -210,12 +199,12 @@ async def google_oauth_callback(
         "token_type": tokens.get("token_type", "Bearer"),
         "expires_in": tokens.get("expires_in"),
         "scope": tokens.get("scope"),
-        "obtained_at": datetime.utcnow().isoformat(),
+        "obtained_at": int(time.time()),
     }
     
+    # Database work is synchronous; run it off the event loop
     # Verify user exists
-    user = crud.get_user_by_id(db, user_id)
-    if not user:
+    if not await asyncio.to_thread(crud.user_exists, db, user_id):
         return RedirectResponse(
             url=f"{FRONTEND_URL}/integrations?error=user_not_found"
         )
@@ -224,24 +213,20 @@ async def google_oauth_callback(
     all_google_services = ["gmail", "calendar", "docs", "sheets", "slides", "drive", "forms", "meet"]
     services_to_connect = all_google_services if service == "google" else [service]
     
-    for svc in services_to_connect:
-        try:
-            # Check if integration already exists
-            existing = crud.get_user_integration(db, user_id, svc)
-            if existing:
-                # Update existing integration
-                crud.update_integration_credentials(db, existing.id, credentials)
-            else:
-                # Create new integration
-                crud.add_integration(
-                    db=db,
-                    user_id=user_id,
-                    service_name=svc,
-                    api_key=None,
-                    credentials=credentials
-                )
-        except Exception as e:
-            print(f"Error storing {svc} integration: {e}")
+    # Insert or update every service's integration in one statement
+    try:
+        await asyncio.to_thread(
+            crud.upsert_integrations,
+            db=db,
+            user_id=user_id,
+            service_names=services_to_connect,
+            credentials=credentials
+        )
+    except Exception:
+        logger.exception("Error storing Google integrations for user %s", user_id)
+        return RedirectResponse(
+            url=f"{FRONTEND_URL}/integrations?error=storage_failed"
+        )
     
     # Redirect back to frontend with success
     return RedirectResponse(
@@ -262,47 +247,43 @@ async def refresh_google_token(refresh_token: str) -> dict | None:
     if not GOOGLE_CLIENT_ID or not GOOGLE_CLIENT_SECRET:
         return None
     
+    # Reuse an access token recently issued for this grant
+    token = google_auth.get_cached_token(refresh_token)
+    if token is not None:
+        return {
+            "access_token": token["access_token"],
+            "token_type": "Bearer",
+            "expires_in": token["expires_in"],
+            "obtained_at": token["obtained_at"],
+        }
+    
+    http = get_http_client()
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                GOOGLE_TOKEN_URL,
-                data={
-                    "client_id": GOOGLE_CLIENT_ID,
-                    "client_secret": GOOGLE_CLIENT_SECRET,
-                    "refresh_token": refresh_token,
-                    "grant_type": "refresh_token",
-                }
-            )
-            
-            if response.status_code != 200:
-                return None
-            
-            tokens = response.json()
-            return {
-                "access_token": tokens.get("access_token"),
-                "token_type": tokens.get("token_type", "Bearer"),
-                "expires_in": tokens.get("expires_in"),
-                "obtained_at": datetime.utcnow().isoformat(),
+        response = await http.post(
+            GOOGLE_TOKEN_URL,
+            data={
+                "client_id": GOOGLE_CLIENT_ID,
+                "client_secret": GOOGLE_CLIENT_SECRET,
+                "refresh_token": refresh_token,
+                "grant_type": "refresh_token",
             }
-            
+        )
+        
+        if response.status_code != 200:
+            return None
+        
+        tokens = response.json()
+        token = google_auth.cache_token(refresh_token, tokens)
+        return {
+            "access_token": token["access_token"],
+            "token_type": tokens.get("token_type", "Bearer"),
+            "expires_in": token["expires_in"],
+            "obtained_at": token["obtained_at"],
+        }
+        
     except Exception:
         return None
 
 
-def is_token_expired(credentials: dict) -> bool:
-    """Check if an OAuth token is expired."""
-    if not credentials:
-        return True
-    
-    obtained_at = credentials.get("obtained_at")
-    expires_in = credentials.get("expires_in", 3600)
-    
-    if not obtained_at:
-        return True
-    
-    try:
-        obtained_dt = datetime.fromisoformat(obtained_at)
-        expiry_dt = obtained_dt + timedelta(seconds=expires_in - 60)  # 60 second buffer
-        return datetime.utcnow() > expiry_dt
-    except:
-        return True
+# Check if an OAuth token is expired; shared with the Google tool modules
+is_token_expired = google_auth.is_token_expired
@@ -3,20 +3,23 @@ Linear OAuth Router
 Handles OAuth 2.0 authentication flow for Linear
 """
 
+import asyncio
+import logging
 import os
 import secrets
-from datetime import datetime, timedelta
+import time
 from urllib.parse import urlencode
 
 from fastapi import APIRouter, HTTPException, status, Depends, Query
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-import httpx
 
 from app.database import get_db
-from app import crud
+from app.http_client import get_http_client
+from app import crud, oauth_state
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Linear OAuth Configuration
 LINEAR_CLIENT_ID = os.getenv("LINEAR_CLIENT_ID", "")
@@ -32,8 +35,14 @@ LINEAR_TOKEN_URL = "https://api.linear.app/oauth/token"
 # Available: read, write, issues:create, comments:create, admin
 LINEAR_SCOPES = ["read", "write", "issues:create", "comments:create"]
 
-# In-memory state storage (in production, use Redis or database)
-_oauth_states: dict[str, dict] = {}
+# Everything in the consent URL except the per-request state is fixed, so encode it once
+_AUTH_QUERY = urlencode({
+    "client_id": LINEAR_CLIENT_ID,
+    "redirect_uri": LINEAR_REDIRECT_URI,
+    "response_type": "code",
+    "scope": ",".join(LINEAR_SCOPES),  # Linear uses comma-separated scopes
+    "actor": "user",  # Resources created as the user
+})
 
 
 @router.get(
@@ -59,22 +68,10 @@ async def linear_oauth_start(
     state = secrets.token_urlsafe(32)
     
     # Store state with user info (expires in 10 minutes)
-    _oauth_states[state] = {
-        "user_id": user_id,
-        "created_at": datetime.utcnow().isoformat()
-    }
-    
-    # Build OAuth URL
-    params = {
-        "client_id": LINEAR_CLIENT_ID,
-        "redirect_uri": LINEAR_REDIRECT_URI,
-        "response_type": "code",
-        "scope": ",".join(LINEAR_SCOPES),  # Linear uses comma-separated scopes
-        "state": state,
-        "actor": "user",  # Resources created as the user
-    }
+    await oauth_state.save_state("linear", state, {"user_id": user_id})
     
-    auth_url = f"{LINEAR_AUTH_URL}?{urlencode(params)}"
+    # Build OAuth URL (token_urlsafe output needs no escaping)
+    auth_url = f"{LINEAR_AUTH_URL}?{_AUTH_QUERY}&state={state}"
     
     return RedirectResponse(url=auth_url)
 
@@ -106,49 +103,42 @@ async def linear_oauth_callback(
             url=f"{FRONTEND_URL}/integrations?error=missing_params"
         )
     
-    # Validate state
-    if state not in _oauth_states:
+    # Validate state (single use; the store drops it after 10 minutes)
+    state_data = await oauth_state.pop_state("linear", state)
+    if state_data is None:
         return RedirectResponse(
             url=f"{FRONTEND_URL}/integrations?error=invalid_state"
         )
     
-    state_data = _oauth_states.pop(state)
     user_id = state_data["user_id"]
     
-    # Check if state is expired (10 minutes)
-    created_at = datetime.fromisoformat(state_data["created_at"])
-    if datetime.utcnow() - created_at > timedelta(minutes=10):
-        return RedirectResponse(
-            url=f"{FRONTEND_URL}/integrations?error=state_expired"
-        )
-    
-    # Exchange code for tokens
+    # Exchange code for tokens over the shared keep-alive client
+    http = get_http_client()
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                LINEAR_TOKEN_URL,
-                data={
-                    "client_id": LINEAR_CLIENT_ID,
-                    "client_secret": LINEAR_CLIENT_SECRET,
-                    "code": code,
-                    "grant_type": "authorization_code",
-                    "redirect_uri": LINEAR_REDIRECT_URI,
-                },
-                headers={
-                    "Content-Type": "application/x-www-form-urlencoded"
-                }
+        response = await http.post(
+            LINEAR_TOKEN_URL,
+            data={
+                "client_id": LINEAR_CLIENT_ID,
+                "client_secret": LINEAR_CLIENT_SECRET,
+                "code": code,
+                "grant_type": "authorization_code",
+                "redirect_uri": LINEAR_REDIRECT_URI,
+            },
+            headers={
+                "Content-Type": "application/x-www-form-urlencoded"
+            }
+        )
+        
+        if response.status_code != 200:
+            error_detail = response.json().get("error_description", "Token exchange failed")
+            return RedirectResponse(
+                url=f"{FRONTEND_URL}/integrations?error={error_detail}"
             )
-            
-            if response.status_code != 200:
-                error_detail = response.json().get("error_description", "Token exchange failed")
-                return RedirectResponse(
-                    url=f"{FRONTEND_URL}/integrations?error={error_detail}"
-                )
-            
-            tokens = response.json()
-            
-    except Exception as e:
-        print(f"Linear OAuth error: {e}")
+        
+        tokens = response.json()
+        
+    except Exception:
+        logger.exception("Linear OAuth token exchange failed")
         return RedirectResponse(
             url=f"{FRONTEND_URL}/integrations?error=token_exchange_failed"
         )
@@ -159,34 +149,28 @@ async def linear_oauth_callback(
         "token_type": tokens.get("token_type", "Bearer"),
         "scope": tokens.get("scope"),
         "expires_in": tokens.get("expires_in"),
-        "obtained_at": datetime.utcnow().isoformat(),
+        "obtained_at": int(time.time()),
     }
     
+    # Database work is synchronous; run it off the event loop
     # Verify user exists
-    user = crud.get_user_by_id(db, user_id)
-    if not user:
+    if not await asyncio.to_thread(crud.user_exists, db, user_id):
         return RedirectResponse(
             url=f"{FRONTEND_URL}/integrations?error=user_not_found"
         )
     
-    # Store Linear integration
+    # Store Linear integration (inserts or updates in one statement)
     try:
-        # Check if integration already exists
-        existing = crud.get_user_integration(db, user_id, "linear")
-        if existing:
-            # Update existing integration
-            crud.update_integration_credentials(db, existing.id, credentials)
-        else:
-            # Create new integration
-            crud.add_integration(
-                db=db,
-                user_id=user_id,
-                service_name="linear",
-                api_key=tokens.get("access_token"),  # Store access token as api_key for tool usage
-                credentials=credentials
-            )
-    except Exception as e:
-        print(f"Error storing Linear integration: {e}")
+        await asyncio.to_thread(
+            crud.add_integration,
+            db=db,
+            user_id=user_id,
+            service_name="linear",
+            api_key=tokens.get("access_token"),  # Store access token as api_key for tool usage
+            credentials=credentials
+        )
+    except Exception:
+        logger.exception("Error storing Linear integration for user %s", user_id)
         return RedirectResponse(
             url=f"{FRONTEND_URL}/integrations?error=storage_failed"
         )
@@ -3,6 +3,7 @@ User Settings Router
 Handles user settings including Gemini API key management
 """
 
+import asyncio
 from fastapi import APIRouter, HTTPException, status, Depends
 from sqlalchemy.orm import Session
 
@@ -25,7 +26,7 @@ async def set_gemini_key(
     Set or update user's Gemini API key.
     The key is encrypted before storage.
     """
-    success = crud.set_user_gemini_key(db, request.user_id, request.api_key)
+    success = await asyncio.to_thread(crud.set_user_gemini_key, db, request.user_id, request.api_key)
     
     if not success:
         raise HTTPException(
@@ -52,15 +53,13 @@ async def check_gemini_key(
     Check if a user has configured their Gemini API key.
     Does not return the actual key for security.
     """
-    user = crud.get_user_by_id(db, user_id)
-    if not user:
+    has_key = await asyncio.to_thread(crud.has_gemini_key, db, user_id)
+    if has_key is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    has_key = crud.has_gemini_key(db, user_id)
-    
     return schemas.GeminiKeyStatus(
         has_key=has_key,
         message="Gemini API key is configured" if has_key else "No Gemini API key configured"
@@ -79,14 +78,14 @@ async def delete_gemini_key(
     """
     Delete user's Gemini API key.
     """
-    user = crud.get_user_by_id(db, user_id)
+    user = await asyncio.to_thread(crud.get_user_by_id, db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    crud.delete_user_gemini_key(db, user_id)
+    await asyncio.to_thread(crud.delete_user_gemini_key, db, user_id, user=user)
     
     return schemas.GeminiKeyStatus(
         has_key=False,
@@ -6,7 +6,7 @@ Request/Response validation models
 from datetime import datetime
 from typing import Optional, Any
 from enum import Enum
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 
 
 # ============== User Schemas ==============
@@ -34,8 +34,7 @@ class UserResponse(BaseModel):
     token: Optional[str] = Field(None, description="JWT access token")
     has_gemini_key: bool = Field(False, description="Whether user has configured Gemini API key")
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserLogin(BaseModel):
@@ -59,6 +58,12 @@ class GeminiKeyStatus(BaseModel):
 
 # ============== Integration Schemas ==============
 
+VALID_SERVICES: frozenset[str] = frozenset({
+    "jira", "gmail", "calendar", "slack", "notion", "bugasura", "github",
+    "docs", "sheets", "slides", "drive", "forms", "meet", "linear",
+})
+
+
 class IntegrationCreate(BaseModel):
     """Schema for connecting a new integration."""
     user_id: int
@@ -72,6 +77,12 @@ class IntegrationCreate(BaseModel):
         description="OAuth credentials or complex auth config"
     )
 
+    @field_validator("service_name")
+    @classmethod
+    def normalize_service_name(cls, value: str) -> str:
+        """Lowercase the service name; the router rejects unsupported services."""
+        return value.lower()
+
 
 class IntegrationResponse(BaseModel):
     """Schema for integration response."""
@@ -81,8 +92,7 @@ class IntegrationResponse(BaseModel):
     created_at: Optional[datetime] = None
     is_connected: bool = True
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class IntegrationList(BaseModel):
@@ -172,14 +182,17 @@ class ConversationResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ConversationList(BaseModel):
-    """Schema for listing conversations."""
+    """Schema for listing conversations (one page)."""
     conversations: list[ConversationResponse]
     total: int
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Opaque cursor; pass as `before` to fetch the next page; null on the last page or when unpaged"
+    )
 
 
 class MessageResponse(BaseModel):
@@ -191,8 +204,7 @@ class MessageResponse(BaseModel):
     actions_taken: Optional[list[ActionResult]] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ConversationUpdate(BaseModel):
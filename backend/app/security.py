@@ -1,35 +1,88 @@
 """
 Security Utilities
-Password hashing (bcrypt) and token encryption (Fernet)
+Password hashing (bcrypt) and token encryption (AES-GCM, Fernet for legacy values)
 """
 
 import os
 import json
+import asyncio
+import base64
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
-from passlib.context import CryptContext
+from typing import Any, Optional, Union
+import bcrypt
+import orjson
 from cryptography.fernet import Fernet
-from jose import jwt, JWTError
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+import jwt
+from jwt import InvalidTokenError
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing
+# bcrypt cost factor (2^rounds iterations), read once at import; pick the lowest
+# value that meets policy (10-13)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+if not 4 <= BCRYPT_ROUNDS <= 31:
+    raise ValueError(f"BCRYPT_ROUNDS must be between 4 and 31, got {BCRYPT_ROUNDS}")
+if BCRYPT_ROUNDS < 10:
+    print(f"WARNING: BCRYPT_ROUNDS={BCRYPT_ROUNDS} is below the recommended minimum of 10.")
+
+# bcrypt only uses the first 72 bytes of a password
+_BCRYPT_MAX_BYTES = 72
+
+# Dedicated workers for bcrypt, so bursts of signups/logins never tie up the shared
+# threadpool the DB calls run on. bcrypt releases the GIL, so hashes run in parallel.
+_bcrypt_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="bcrypt")
 
 # Encryption key for API tokens
 ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY")
 
 if not ENCRYPTION_KEY:
-    # Generate a key for development (in production, always use env var)
-    ENCRYPTION_KEY = Fernet.generate_key().decode()
-    print("WARNING: Using generated ENCRYPTION_KEY. Set this in .env for production!")
+    if os.getenv("DEBUG") != "1":
+        # A generated key would make every stored secret undecryptable after a restart
+        raise RuntimeError("ENCRYPTION_KEY must be set (or run with DEBUG=1 to use the development key)")
+    # Fixed development key, so local data survives restarts (never use outside DEBUG)
+    ENCRYPTION_KEY = base64.urlsafe_b64encode(hashlib.sha256(b"locus-development-key").digest())
+    print("WARNING: Using the development ENCRYPTION_KEY. Set this in .env for production!")
 
 # Ensure key is bytes
 if isinstance(ENCRYPTION_KEY, str):
     ENCRYPTION_KEY = ENCRYPTION_KEY.encode()
 
-fernet = Fernet(ENCRYPTION_KEY)
+# Cipher contexts are built once per process and shared by every encrypt/decrypt
+# call: constructing AESGCM expands the AES key schedule, which costs roughly
+# twice as much as sealing a short token. Do not create per-call instances.
+
+# Fernet is only used to read values stored before the switch to AES-GCM
+_legacy_fernet = Fernet(ENCRYPTION_KEY)
+
+# AES-256-GCM key derived from ENCRYPTION_KEY
+_aesgcm = AESGCM(HKDF(
+    algorithm=hashes.SHA256(),
+    length=32,
+    salt=None,
+    info=b"locus-aes-gcm",
+).derive(base64.urlsafe_b64decode(ENCRYPTION_KEY)))
+
+# Ciphertext layout: version byte || 12-byte nonce || ciphertext || 16-byte tag
+_AESGCM_VERSION = b"\x01"
+_NONCE_SIZE = 12
+
+# Keyed BLAKE2b for change detection, so stored fingerprints cannot be checked offline
+_FINGERPRINT_KEY = HKDF(
+    algorithm=hashes.SHA256(),
+    length=32,
+    salt=None,
+    info=b"locus-fingerprint",
+).derive(base64.urlsafe_b64decode(ENCRYPTION_KEY))
+
+# Hasher with the key block already absorbed; each fingerprint starts from a copy
+_fingerprint_hasher = hashlib.blake2b(digest_size=16, key=_FINGERPRINT_KEY)
 
 # JWT Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-for-jwt-here")
@@ -46,10 +99,8 @@ def create_access_token(
     remember_me: bool = False
 ) -> str:
     """Create a JWT access token for a user."""
-    if remember_me:
-        expire = datetime.now(timezone.utc) + timedelta(days=30)
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(hours=1)
+    lifetime = timedelta(days=30) if remember_me else timedelta(hours=1)
+    expire = datetime.now(timezone.utc) + lifetime
     to_encode = {
         "sub": str(user_id),
         "email": email,
@@ -65,7 +116,7 @@ def verify_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
-    except JWTError:
+    except InvalidTokenError:
         return None
 
 
@@ -73,46 +124,146 @@ def verify_token(token: str) -> Optional[dict]:
 
 def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt."""
-    return pwd_context.hash(password)
+    secret = password.encode()[:_BCRYPT_MAX_BYTES]
+    return bcrypt.hashpw(secret, bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    secret = plain_password.encode()[:_BCRYPT_MAX_BYTES]
+    try:
+        return bcrypt.checkpw(secret, hashed_password.encode())
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the bcrypt worker pool, off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_pool, get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt worker pool, off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_pool, verify_password, plain_password, hashed_password)
+
+
+# Cost of the hashes already stored (passlib's default); existing hashes keep the
+# cost they were created with even if BCRYPT_ROUNDS is lowered later
+_LEGACY_BCRYPT_ROUNDS = 12
+
+# Verified against when a login email is unknown, so both paths cost one bcrypt check.
+# Uses the highest cost in use, so unknown emails are never faster than known ones.
+DUMMY_PASSWORD_HASH = bcrypt.hashpw(
+    b"locus-dummy-password", bcrypt.gensalt(rounds=max(BCRYPT_ROUNDS, _LEGACY_BCRYPT_ROUNDS))
+).decode()
 
 
 # ============== Token Encryption Functions ==============
 
-def encrypt_token(token: str) -> str:
-    """Encrypt an API token using Fernet symmetric encryption."""
+def _encrypt_bytes(data: bytes) -> bytes:
+    """Encrypt raw bytes with AES-GCM: version byte || nonce || ciphertext || tag."""
+    nonce = os.urandom(_NONCE_SIZE)
+    return _AESGCM_VERSION + nonce + _aesgcm.encrypt(nonce, data, None)
+
+
+def _decrypt_legacy_text(encrypted: str) -> bytes:
+    """Decrypt a text value from before binary storage (base64 AES-GCM or Fernet)."""
+    raw = base64.urlsafe_b64decode(encrypted)
+    if raw[:1] != _AESGCM_VERSION:
+        # Fernet tokens start with version byte 0x80
+        return _legacy_fernet.decrypt(encrypted.encode())
+    return _decrypt_bytes(raw)
+
+
+def _decrypt_bytes(encrypted: Union[bytes, str]) -> bytes:
+    """Decrypt a value produced by _encrypt_bytes (or a legacy text value)."""
+    if isinstance(encrypted, str):
+        return _decrypt_legacy_text(encrypted)
+    if encrypted[:1] != _AESGCM_VERSION:
+        # Text ciphertext that was cast to bytes but not yet converted
+        return _decrypt_legacy_text(encrypted.decode())
+    # Slice through a memoryview so the ciphertext is not copied before decrypting
+    view = memoryview(encrypted)
+    return _aesgcm.decrypt(view[1:1 + _NONCE_SIZE], view[1 + _NONCE_SIZE:], None)
+
+
+def to_binary_ciphertext(encrypted: Union[bytes, str]) -> bytes:
+    """
+    Convert a stored ciphertext to the binary AES-GCM format.
+    
+    Base64 AES-GCM values are only decoded; legacy Fernet values are re-encrypted.
+    Values already in the binary format are returned unchanged.
+    """
+    if isinstance(encrypted, bytes):
+        if encrypted[:1] == _AESGCM_VERSION:
+            return encrypted
+        encrypted = encrypted.decode()
+    raw = base64.urlsafe_b64decode(encrypted)
+    if raw[:1] == _AESGCM_VERSION:
+        return raw
+    return _encrypt_bytes(_legacy_fernet.decrypt(encrypted.encode()))
+
+
+def encrypt_many(plaintexts: list[Optional[bytes]]) -> list[Optional[bytes]]:
+    """Encrypt several values in one batch. Empty values map to None."""
+    return [_encrypt_bytes(data) if data else None for data in plaintexts]
+
+
+def encrypt_token(token: Union[str, bytes]) -> bytes:
+    """Encrypt an API token using AES-GCM (bytes are encrypted as-is, without a copy)."""
     if not token:
-        return ""
-    encrypted = fernet.encrypt(token.encode())
-    return encrypted.decode()
+        return b""
+    return _encrypt_bytes(token if isinstance(token, bytes) else token.encode())
 
 
-def decrypt_token(encrypted_token: str) -> str:
+def decrypt_token(encrypted_token: Union[bytes, str]) -> str:
     """Decrypt an API token."""
     if not encrypted_token:
         return ""
-    decrypted = fernet.decrypt(encrypted_token.encode())
-    return decrypted.decode()
+    return _decrypt_bytes(encrypted_token).decode()
 
 
 # ============== Credentials Encryption (for OAuth/complex auth) ==============
 
-def encrypt_credentials(credentials: dict[str, Any]) -> str:
+def encrypt_credentials(credentials: dict[str, Any]) -> bytes:
     """Encrypt a credentials dictionary as JSON."""
     if not credentials:
-        return ""
-    json_str = json.dumps(credentials)
-    encrypted = fernet.encrypt(json_str.encode())
-    return encrypted.decode()
+        return b""
+    return _encrypt_bytes(orjson.dumps(credentials))
 
 
-def decrypt_credentials(encrypted_credentials: str) -> dict[str, Any]:
+def decrypt_credentials(encrypted_credentials: Union[bytes, str]) -> dict[str, Any]:
     """Decrypt credentials back to dictionary."""
     if not encrypted_credentials:
         return {}
-    decrypted = fernet.decrypt(encrypted_credentials.encode())
-    return json.loads(decrypted.decode())
+    return orjson.loads(_decrypt_bytes(encrypted_credentials))
+
+
+def fingerprint_secrets(
+    api_key: Optional[str],
+    credentials: Optional[dict[str, Any]]
+) -> str:
+    """Return a keyed BLAKE2b-128 digest of an integration's plaintext secrets."""
+    canonical = json.dumps(
+        [api_key or None, credentials or None],
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    hasher = _fingerprint_hasher.copy()
+    hasher.update(canonical.encode())
+    return hasher.hexdigest()
+
+
+def encrypt_integration_secrets(
+    api_key: Optional[str],
+    credentials: Optional[dict[str, Any]]
+) -> tuple[Optional[bytes], Optional[bytes]]:
+    """Encrypt an integration's API key and credentials in one batch."""
+    encrypted_api_key, encrypted_credentials = encrypt_many([
+        api_key.encode() if api_key else None,
+        orjson.dumps(credentials) if credentials else None,
+    ])
+    return encrypted_api_key, encrypted_credentials
@@ -3,8 +3,12 @@ LangChain Agent Orchestrator
 Main agent that processes natural language and routes to appropriate tools
 """
 
+import hashlib
 import os
+import re
+from dataclasses import dataclass
 from typing import Any, Optional
+import orjson
 from dotenv import load_dotenv
 
 from langchain_google_genai import ChatGoogleGenerativeAI
@@ -12,6 +16,7 @@ from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.tools import BaseTool
 
+from app.cache import TTLCache
 from app.schemas import ChatResponse, ActionResult
 from app.services.jira import get_jira_tools
 from app.services.gmail import get_gmail_tools
@@ -30,8 +35,48 @@ from app.services.linear import get_linear_tools
 
 load_dotenv()
 
-# Fallback to server-level API key if user hasn't configured their own
-FALLBACK_GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+
+@dataclass(frozen=True, slots=True)
+class AgentSettings:
+    """Agent and Gemini settings, read from the environment once at import."""
+    # Fallback to server-level API key if user hasn't configured their own
+    fallback_google_api_key: Optional[str]
+    # Gemini models for normal and smart mode; override to pick a lower-latency tier
+    gemini_model: str
+    gemini_smart_model: str
+    # Per-call generation cap (includes 2.5 thinking tokens) and timeout in seconds,
+    # so a runaway generation or stalled call cannot hold a chat turn open
+    gemini_max_output_tokens: int
+    gemini_timeout: float
+    # Upper bound on agent steps per turn (high enough for multi-tool requests)
+    agent_max_iterations: int
+    # Print each agent step to stdout; the console handler runs inline with the
+    # agent, so it is off unless AGENT_VERBOSE=1 (e.g. while debugging prompts)
+    agent_verbose: bool
+
+    @classmethod
+    def from_env(cls) -> "AgentSettings":
+        return cls(
+            fallback_google_api_key=os.getenv("GOOGLE_API_KEY"),
+            gemini_model=os.getenv("GEMINI_MODEL", "gemini-2.5-flash"),
+            gemini_smart_model=os.getenv("GEMINI_SMART_MODEL", "gemini-2.5-pro"),
+            gemini_max_output_tokens=int(os.getenv("GEMINI_MAX_OUTPUT_TOKENS", "4096")),
+            gemini_timeout=float(os.getenv("GEMINI_TIMEOUT", "60")),
+            agent_max_iterations=int(os.getenv("AGENT_MAX_ITERATIONS", "25")),
+            agent_verbose=os.getenv("AGENT_VERBOSE") == "1",
+        )
+
+
+settings = AgentSettings.from_env()
+
+# Each Gemini client holds its own gRPC (HTTP/2) channel; reusing clients per
+# API key and model keeps connections warm instead of handshaking every turn
+_llm_cache = TTLCache(maxsize=256, ttl=3600)
+
+# Agent executors per (API key, model, tool set). The tools are module-level
+# singletons that read their integration's config at call time, so an executor
+# built for one request works for any later one with the same integrations.
+_agent_cache = TTLCache(maxsize=64, ttl=3600)
 
 
 def get_llm(api_key: str, smart_mode: bool = False) -> ChatGoogleGenerativeAI:
@@ -43,16 +88,35 @@ def get_llm(api_key: str, smart_mode: bool = False) -> ChatGoogleGenerativeAI:
         smart_mode: Use higher intelligence model when True
         
     Returns:
-        ChatGoogleGenerativeAI instance
+        ChatGoogleGenerativeAI instance, shared by requests using the same key and model
     """
-    model = "gemini-2.5-pro" if smart_mode else "gemini-2.5-flash"
+    model = settings.gemini_smart_model if smart_mode else settings.gemini_model
+    
+    # Key on a digest so plaintext API keys are not kept as cache keys
+    cache_key = (hashlib.sha256((api_key or "").encode()).hexdigest(), model)
+    llm = _llm_cache.get(cache_key)
+    if llm is None:
+        llm = ChatGoogleGenerativeAI(
+            model=model,
+            google_api_key=api_key,
+            temperature=0.1,
+            max_output_tokens=settings.gemini_max_output_tokens,
+            timeout=settings.gemini_timeout,
+            convert_system_message_to_human=True,
+        )
+        _llm_cache.set(cache_key, llm)
+    return llm
+
+
+def close_llm_clients() -> None:
+    """
+    Drop the cached Gemini models and agent executors.
     
-    return ChatGoogleGenerativeAI(
-        model=model,
-        google_api_key=api_key,
-        temperature=0.1,
-        convert_system_message_to_human=True,
-    )
+    This only releases the references; each client's gRPC channel is closed
+    when the client is garbage-collected, not by this call.
+    """
+    _agent_cache.clear()
+    _llm_cache.clear()
 
 
 # System prompt for the agent
@@ -160,6 +224,24 @@ EXAMPLE: If user says "send a Slack message to #general, create a Jira ticket, a
 
 NEVER stop after just 1-2 actions if the user requested more. ALWAYS complete ALL requested tasks."""
 
+# Prompt for the tool calling agent; the template is constant, so it is parsed once
+AGENT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_PROMPT),
+    ("human", "{input}"),
+    MessagesPlaceholder(variable_name="agent_scratchpad"),
+])
+
+
+# Tool name -> service, filled in as build_tools sees each integration's tools
+_tool_services: dict[str, str] = {}
+
+
+def _add_tools(tools: list[BaseTool], service: str, service_tools: list[BaseTool]) -> None:
+    """Append an integration's tools and remember which service each one belongs to."""
+    for tool in service_tools:
+        _tool_services[tool.name] = service
+    tools.extend(service_tools)
+
 
 def build_tools(integration_configs: dict[str, dict]) -> list[BaseTool]:
     """
@@ -175,7 +257,7 @@ def build_tools(integration_configs: dict[str, dict]) -> list[BaseTool]:
             email=config.get("credentials", {}).get("email", ""),
             url=config.get("credentials", {}).get("url", "")
         )
-        tools.extend(jira_tools)
+        _add_tools(tools, "jira", jira_tools)
     
     # Gmail tools
     if "gmail" in integration_configs:
@@ -184,7 +266,7 @@ def build_tools(integration_configs: dict[str, dict]) -> list[BaseTool]:
             credentials=config.get("credentials", {}),
             api_key=config.get("api_key", "")
         )
-        tools.extend(gmail_tools)
+        _add_tools(tools, "gmail", gmail_tools)
     
     # Calendar tools
     if "calendar" in integration_configs:
@@ -192,7 +274,7 @@ def build_tools(integration_configs: dict[str, dict]) -> list[BaseTool]:
         calendar_tools = get_calendar_tools(
             credentials=config.get("credentials", {})
         )
-        tools.extend(calendar_tools)
+        _add_tools(tools, "calendar", calendar_tools)
     
     # Slack tools
     if "slack" in integration_configs:
@@ -200,7 +282,7 @@ def build_tools(integration_configs: dict[str, dict]) -> list[BaseTool]:
         slack_tools = get_slack_tools(
             bot_token=config.get("api_key", "")
         )
-        tools.extend(slack_tools)
+        _add_tools(tools, "slack", slack_tools)
     
     # Notion tools
     if "notion" in integration_configs:
@@ -208,7 +290,7 @@ def build_tools(integration_configs: dict[str, dict]) -> list[BaseTool]:
         notion_tools = get_notion_tools(
             integration_token=config.get("api_key", "")
         )
-        tools.extend(notion_tools)
+        _add_tools(tools, "notion", notion_tools)
     
     # Bugasura tools
     if "bugasura" in integration_configs:
@@ -218,7 +300,7 @@ def build_tools(integration_configs: dict[str, dict]) -> list[BaseTool]:
             team_id=config.get("credentials", {}).get("team_id", ""),
             project_key=config.get("credentials", {}).get("project_key", "")
         )
-        tools.extend(bugasura_tools)
+        _add_tools(tools, "bugasura", bugasura_tools)
     
     # Google Docs tools
     if "docs" in integration_configs:
@@ -226,7 +308,7 @@ def build_tools(integration_configs: dict[str, dict]) -> list[BaseTool]:
         docs_tools = get_docs_tools(
             credentials=config.get("credentials", {})
         )
-        tools.extend(docs_tools)
+        _add_tools(tools, "docs", docs_tools)
     
     # Google Sheets tools
     if "sheets" in integration_configs:
@@ -234,7 +316,7 @@ def build_tools(integration_configs: dict[str, dict]) -> list[BaseTool]:
         sheets_tools = get_sheets_tools(
             credentials=config.get("credentials", {})
         )
-        tools.extend(sheets_tools)
+        _add_tools(tools, "sheets", sheets_tools)
     
     # Google Slides tools
     if "slides" in integration_configs:
@@ -242,7 +324,7 @@ def build_tools(integration_configs: dict[str, dict]) -> list[BaseTool]:
         slides_tools = get_slides_tools(
             credentials=config.get("credentials", {})
         )
-        tools.extend(slides_tools)
+        _add_tools(tools, "slides", slides_tools)
     
     # Google Drive tools
     if "drive" in integration_configs:
@@ -250,7 +332,7 @@ def build_tools(integration_configs: dict[str, dict]) -> list[BaseTool]:
         drive_tools = get_drive_tools(
             credentials=config.get("credentials", {})
         )
-        tools.extend(drive_tools)
+        _add_tools(tools, "drive", drive_tools)
     
     # Google Forms tools
     if "forms" in integration_configs:
@@ -258,7 +340,7 @@ def build_tools(integration_configs: dict[str, dict]) -> list[BaseTool]:
         forms_tools = get_forms_tools(
             credentials=config.get("credentials", {})
         )
-        tools.extend(forms_tools)
+        _add_tools(tools, "forms", forms_tools)
     
     # Google Meet tools
     if "meet" in integration_configs:
@@ -266,7 +348,7 @@ def build_tools(integration_configs: dict[str, dict]) -> list[BaseTool]:
         meet_tools = get_meet_tools(
             credentials=config.get("credentials", {})
         )
-        tools.extend(meet_tools)
+        _add_tools(tools, "meet", meet_tools)
     
     # GitHub tools
     if "github" in integration_configs:
@@ -274,7 +356,7 @@ def build_tools(integration_configs: dict[str, dict]) -> list[BaseTool]:
         github_tools = get_github_tools(
             token=config.get("api_key", "")
         )
-        tools.extend(github_tools)
+        _add_tools(tools, "github", github_tools)
     
     # Linear tools
     if "linear" in integration_configs:
@@ -282,7 +364,7 @@ def build_tools(integration_configs: dict[str, dict]) -> list[BaseTool]:
         linear_tools = get_linear_tools(
             api_key=config.get("api_key", "")
         )
-        tools.extend(linear_tools)
+        _add_tools(tools, "linear", linear_tools)
     
     return tools
 
@@ -295,26 +377,110 @@ def create_agent_executor(tools: list[BaseTool], api_key: str, smart_mode: bool
         api_key: User's Gemini API key
         smart_mode: Use higher intelligence model when True
     """
+    cache_key = (
+        hashlib.sha256((api_key or "").encode()).hexdigest(),
+        smart_mode,
+        tuple(tool.name for tool in tools),
+    )
+    executor = _agent_cache.get(cache_key)
+    if executor is not None:
+        return executor
+    
     # Create LLM with user's API key
     selected_llm = get_llm(api_key, smart_mode)
     
-    # Create a prompt that works with the tool calling agent
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", SYSTEM_PROMPT),
-        ("human", "{input}"),
-        MessagesPlaceholder(variable_name="agent_scratchpad"),
-    ])
-    
     # Use tool calling agent instead of ReAct for better structured output
-    agent = create_tool_calling_agent(selected_llm, tools, prompt)
+    agent = create_tool_calling_agent(selected_llm, tools, AGENT_PROMPT)
     
-    return AgentExecutor(
+    executor = AgentExecutor(
         agent=agent,
         tools=tools,
-        verbose=True,
+        verbose=settings.agent_verbose,
         handle_parsing_errors=True,
-        max_iterations=25  # Increased for multi-tool requests (up to 25 tools)
+        return_intermediate_steps=True,  # Needed to report actions_taken
+        max_iterations=settings.agent_max_iterations,
+        early_stopping_method="force"  # Stop with a fixed answer instead of another LLM call
     )
+    _agent_cache.set(cache_key, executor)
+    return executor
+
+
+def _observation_text(observation: Any) -> str:
+    """Tool output as text: JSON for structured results, str() for everything else."""
+    if isinstance(observation, (dict, list)):
+        try:
+            return orjson.dumps(observation).decode()
+        except TypeError:
+            pass  # Holds values orjson cannot encode
+    return str(observation)
+
+
+def _jql_text_search(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace('"', '\\"')
+    return f'text ~ "{escaped}" ORDER BY updated DESC'
+
+
+# Unambiguous commands run directly against their tool, skipping the LLM round trip.
+# Each pattern must match the whole message and capture everything the tool needs.
+# Only read-only tools belong here: a misread message must never send or change anything.
+_FAST_PATH_COMMANDS = (
+    (
+        re.compile(r"(?:search|find)\s+jira\s+for\s+(?P<query>.+)", re.IGNORECASE | re.DOTALL),
+        "jira_search_issues",
+        lambda match: {"jql": _jql_text_search(match["query"]), "max_results": 10},
+    ),
+)
+
+# A separator, conjunction or second action verb means the message holds more than
+# one command (e.g. "search jira for X and send it to #qa"), so the agent handles it
+_COMPOUND_MESSAGE = re.compile(
+    r"[,;&|\n]|\b(?:and|then|also|plus|after|before|send|post|create|update|delete|"
+    r"add|assign|comment|reply|share|forward|notify|email|message)\b",
+    re.IGNORECASE
+)
+
+
+async def _try_fast_path(message: str, tools: list[BaseTool]) -> Optional[ChatResponse]:
+    """Run a high-confidence keyword command directly; None if the agent should handle it."""
+    text = message.strip()
+    if _COMPOUND_MESSAGE.search(text):
+        return None
+    for pattern, tool_name, build_args in _FAST_PATH_COMMANDS:
+        match = pattern.fullmatch(text)
+        if match is None:
+            continue
+        tool = next((t for t in tools if t.name == tool_name), None)
+        if tool is None:
+            return None
+        
+        try:
+            observation = _observation_text(await tool.ainvoke(build_args(match)))
+        except Exception as e:
+            return ChatResponse.model_construct(
+                message=f"I encountered an error while processing your request: {str(e)}",
+                actions_taken=[ActionResult.model_construct(
+                    service=determine_service(tool_name),
+                    action=tool_name,
+                    success=False,
+                    error=str(e)
+                )],
+                raw_response=None
+            )
+        
+        # Same success heuristic as the streaming path
+        success = "error" not in observation.lower()[:50]
+        return ChatResponse.model_construct(
+            message=observation,
+            actions_taken=[ActionResult.model_construct(
+                service=determine_service(tool_name),
+                action=tool_name,
+                success=success,
+                result=observation if success else None,
+                error=None if success else observation
+            )],
+            raw_response=observation
+        )
+    return None
 
 
 async def process_chat_message(
@@ -336,71 +502,86 @@ async def process_chat_message(
     tools = build_tools(integration_configs)
     
     if not tools:
-        return ChatResponse(
+        return ChatResponse.model_construct(
             message="No integration tools available. Please connect at least one service.",
             actions_taken=[],
             raw_response=None
         )
     
     # Check for API key - use user's key or fall back to server key
-    api_key = gemini_api_key or FALLBACK_GOOGLE_API_KEY
+    api_key = gemini_api_key or settings.fallback_google_api_key
     
     if not api_key:
-        return ChatResponse(
+        return ChatResponse.model_construct(
             message="No Gemini API key configured. Please add your Gemini API key in Settings.",
             actions_taken=[],
             raw_response=None
         )
     
-    # Create and run agent SYNCHRONOUSLY to avoid coroutine issues
+    fast_response = await _try_fast_path(message, tools)
+    if fast_response is not None:
+        return fast_response
+    
     agent = create_agent_executor(tools, api_key=api_key, smart_mode=smart_mode)
     
     try:
-        # Use sync invoke instead of ainvoke to avoid StopIteration errors
-        result = agent.invoke({"input": message})
-        
-        output = result.get("output", "")
-        intermediate_steps = result.get("intermediate_steps", [])
-        
-        # Extract actions taken
-        actions_taken: list[ActionResult] = []
-        for step in intermediate_steps:
-            if len(step) >= 2:
-                action, observation = step[0], step[1]
-                tool_name = getattr(action, "tool", "unknown")
-                
-                service = determine_service(tool_name)
-                
-                actions_taken.append(ActionResult(
-                    service=service,
-                    action=tool_name,
-                    success=True,
-                    result=str(observation) if observation else None
-                ))
-        
-        return ChatResponse(
-            message=output,
-            actions_taken=actions_taken,
-            raw_response=output
-        )
-        
+        # Async invoke, as the streaming path already does with astream_events. LangChain
+        # runs the sync tools in worker threads with a copy of this context, so they see
+        # the integration configs build_tools set above.
+        result = await agent.ainvoke({"input": message})
+        return _agent_response(result)
     except Exception as e:
-        return ChatResponse(
-            message=f"I encountered an error while processing your request: {str(e)}",
-            actions_taken=[
-                ActionResult(
-                    service="agent",
-                    action="process_message",
-                    success=False,
-                    error=str(e)
-                )
-            ],
-            raw_response=None
+        return _agent_error_response(e)
+
+
+def _agent_response(result: dict[str, Any]) -> ChatResponse:
+    """Build a ChatResponse from an AgentExecutor result."""
+    output = result.get("output", "")
+    intermediate_steps = result.get("intermediate_steps", [])
+    
+    # Extract actions taken. These models are built from our own values, so
+    # results here and elsewhere in this module use model_construct and skip validation.
+    actions_taken = [
+        ActionResult.model_construct(
+            service=determine_service(tool_name),
+            action=tool_name,
+            success=True,
+            result=_observation_text(step[1]) if step[1] else None
         )
+        for step in intermediate_steps if len(step) >= 2
+        for tool_name in (getattr(step[0], "tool", "unknown"),)
+    ]
+    
+    return ChatResponse.model_construct(
+        message=output,
+        actions_taken=actions_taken,
+        raw_response=output
+    )
+
+
+def _agent_error_response(error: Exception) -> ChatResponse:
+    """Build the ChatResponse reported when the agent run raises."""
+    return ChatResponse.model_construct(
+        message=f"I encountered an error while processing your request: {str(error)}",
+        actions_taken=[
+            ActionResult.model_construct(
+                service="agent",
+                action="process_message",
+                success=False,
+                error=str(error)
+            )
+        ],
+        raw_response=None
+    )
 
 
 def determine_service(tool_name: str) -> str:
     """Determine the service from tool name."""
+    service = _tool_services.get(tool_name)
+    if service is not None:
+        return service
+    
+    # Not a tool build_tools has produced; guess from the name
     tool_lower = tool_name.lower()
     if "jira" in tool_lower:
         return "jira"
@@ -433,6 +614,22 @@ def determine_service(tool_name: str) -> str:
     return "unknown"
 
 
+# (service, verb) name fragments of the tools the keyword fallback can call
+_KEYWORD_TOOLS = (("jira", "create"), ("jira", "search"), ("slack", "send"), ("calendar", "create"))
+
+# Intent keywords, each set matched in one regex pass over the lowercased message
+_JIRA_INTENT = re.compile("jira|ticket|issue")
+_JIRA_SEARCH_INTENT = re.compile("search|find")
+_SLACK_INTENT = re.compile("slack|post")
+_SLACK_SEND_INTENT = re.compile("send|post")
+_CALENDAR_INTENT = re.compile("calendar|schedule|meeting")
+_CALENDAR_CREATE_INTENT = re.compile("create|schedule")
+
+# Command words stripped from the message to leave the issue summary / search query
+_JIRA_CREATE_WORDS = re.compile(r"\b(?:create|jira|ticket|issue)\b", re.IGNORECASE)
+_JIRA_SEARCH_WORDS = re.compile(r"\b(?:search|find|jira)\b", re.IGNORECASE)
+
+
 async def process_without_llm(
     message: str,
     tools: list[BaseTool],
@@ -445,86 +642,90 @@ async def process_without_llm(
     actions_taken: list[ActionResult] = []
     response_parts: list[str] = []
     
+    # Index the usable tools once (first match wins) instead of rescanning per command
+    tool_index: dict[tuple[str, str], BaseTool] = {}
+    for tool in tools:
+        name = tool.name.lower()
+        for service, verb in _KEYWORD_TOOLS:
+            if service in name and verb in name:
+                tool_index.setdefault((service, verb), tool)
+    
     # Jira commands
-    if "jira" in message_lower or "ticket" in message_lower or "issue" in message_lower:
+    if _JIRA_INTENT.search(message_lower):
         if "create" in message_lower:
             # Extract summary from message
-            summary = message.replace("create", "").replace("jira", "").replace("ticket", "").replace("issue", "").strip()
+            summary = _JIRA_CREATE_WORDS.sub("", message).strip()
             if not summary:
                 summary = "New issue from Conflux"
             
-            for tool in tools:
-                if "create" in tool.name.lower() and "jira" in tool.name.lower():
-                    try:
-                        result = tool.invoke({"summary": summary, "description": "", "project_key": "CONFLUX", "issue_type": "Task"})
-                        response_parts.append(str(result))
-                        actions_taken.append(ActionResult(
-                            service="jira",
-                            action=tool.name,
-                            success=True,
-                            result=str(result)
-                        ))
-                    except Exception as e:
-                        response_parts.append(f"Error: {e}")
-                    break
-        elif "search" in message_lower or "find" in message_lower:
-            query = message.replace("search", "").replace("find", "").replace("jira", "").strip()
-            for tool in tools:
-                if "search" in tool.name.lower() and "jira" in tool.name.lower():
-                    try:
-                        result = tool.invoke({"query": query, "max_results": 5})
-                        response_parts.append(str(result))
-                        actions_taken.append(ActionResult(
-                            service="jira",
-                            action=tool.name,
-                            success=True,
-                            result=str(result)
-                        ))
-                    except Exception as e:
-                        response_parts.append(f"Error: {e}")
-                    break
+            tool = tool_index.get(("jira", "create"))
+            if tool is not None:
+                try:
+                    result = _observation_text(tool.invoke({"summary": summary, "description": "", "project_key": "CONFLUX", "issue_type": "Task"}))
+                    response_parts.append(result)
+                    actions_taken.append(ActionResult.model_construct(
+                        service="jira",
+                        action=tool.name,
+                        success=True,
+                        result=result
+                    ))
+                except Exception as e:
+                    response_parts.append(f"Error: {e}")
+        elif _JIRA_SEARCH_INTENT.search(message_lower):
+            query = _JIRA_SEARCH_WORDS.sub("", message).strip()
+            tool = tool_index.get(("jira", "search"))
+            if tool is not None:
+                try:
+                    result = _observation_text(tool.invoke({"query": query, "max_results": 5}))
+                    response_parts.append(result)
+                    actions_taken.append(ActionResult.model_construct(
+                        service="jira",
+                        action=tool.name,
+                        success=True,
+                        result=result
+                    ))
+                except Exception as e:
+                    response_parts.append(f"Error: {e}")
     
     # Slack commands
-    if "slack" in message_lower or "post" in message_lower:
-        if "send" in message_lower or "post" in message_lower:
-            for tool in tools:
-                if "slack" in tool.name.lower() and "send" in tool.name.lower():
-                    try:
-                        result = tool.invoke({"channel": "general", "message": message})
-                        response_parts.append(str(result))
-                        actions_taken.append(ActionResult(
-                            service="slack",
-                            action=tool.name,
-                            success=True,
-                            result=str(result)
-                        ))
-                    except Exception as e:
-                        response_parts.append(f"Error: {e}")
-                    break
+    if _SLACK_INTENT.search(message_lower):
+        if _SLACK_SEND_INTENT.search(message_lower):
+            tool = tool_index.get(("slack", "send"))
+            if tool is not None:
+                try:
+                    result = _observation_text(tool.invoke({"channel": "general", "message": message}))
+                    response_parts.append(result)
+                    actions_taken.append(ActionResult.model_construct(
+                        service="slack",
+                        action=tool.name,
+                        success=True,
+                        result=result
+                    ))
+                except Exception as e:
+                    response_parts.append(f"Error: {e}")
     
     # Calendar commands
-    if "calendar" in message_lower or "schedule" in message_lower or "meeting" in message_lower:
-        if "create" in message_lower or "schedule" in message_lower:
-            for tool in tools:
-                if "calendar" in tool.name.lower() and "create" in tool.name.lower():
-                    try:
-                        result = tool.invoke({
-                            "summary": message,
-                            "description": "",
-                            "start_time": "tomorrow at 2pm",
-                            "duration_minutes": 60,
-                            "attendees": ""
-                        })
-                        response_parts.append(str(result))
-                        actions_taken.append(ActionResult(
-                            service="calendar",
-                            action=tool.name,
-                            success=True,
-                            result=str(result)
-                        ))
-                    except Exception as e:
-                        response_parts.append(f"Error: {e}")
-                    break
+    if _CALENDAR_INTENT.search(message_lower):
+        if _CALENDAR_CREATE_INTENT.search(message_lower):
+            tool = tool_index.get(("calendar", "create"))
+            if tool is not None:
+                try:
+                    result = _observation_text(tool.invoke({
+                        "summary": message,
+                        "description": "",
+                        "start_time": "tomorrow at 2pm",
+                        "duration_minutes": 60,
+                        "attendees": ""
+                    }))
+                    response_parts.append(result)
+                    actions_taken.append(ActionResult.model_construct(
+                        service="calendar",
+                        action=tool.name,
+                        success=True,
+                        result=result
+                    ))
+                except Exception as e:
+                    response_parts.append(f"Error: {e}")
     
     if not response_parts:
         response_parts.append(
@@ -537,7 +738,7 @@ async def process_without_llm(
             "\nNote: For full natural language support, please configure your GOOGLE_API_KEY."
         )
     
-    return ChatResponse(
+    return ChatResponse.model_construct(
         message="\n\n".join(response_parts),
         actions_taken=actions_taken,
         raw_response=None
@@ -552,6 +753,43 @@ from typing import AsyncGenerator
 from app.services.task_planner import parse_tasks_from_message, TaskPlan, TaskStatus
 
 
+def _chunk_text(chunk: Any) -> str:
+    """Extract the text from a streamed model chunk (content may be a list of parts)."""
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part if isinstance(part, str) else part.get("text", "")
+        for part in content
+        if isinstance(part, (str, dict))
+    )
+
+
+async def _stream_agent_run(
+    agent: AgentExecutor,
+    agent_input: str,
+    result: dict[str, Any]
+) -> AsyncGenerator[dict, None]:
+    """
+    Run the agent, yielding token events as the model generates text.
+    
+    The executor's final output (output and intermediate_steps) is stored
+    into result once the run finishes.
+    """
+    async for agent_event in agent.astream_events({"input": agent_input}, version="v2"):
+        kind = agent_event["event"]
+        if kind == "on_chat_model_stream":
+            delta = _chunk_text(agent_event["data"]["chunk"])
+            if delta:
+                yield {
+                    "event_type": "token",
+                    "data": {"delta": delta}
+                }
+        elif kind == "on_chain_end" and not agent_event.get("parent_ids"):
+            # End of the root run: the executor's final output
+            result.update(agent_event["data"].get("output") or {})
+
+
 async def process_chat_message_streaming(
     message: str,
     integration_configs: dict[str, dict],
@@ -563,6 +801,7 @@ async def process_chat_message_streaming(
     Yields SSE events for real-time frontend updates:
     - planning: Initial message that we're analyzing
     - plan: Task plan with all identified tasks
+    - token: Incremental model text as it is generated
     - task_started: When a task begins execution
     - task_completed: When a task finishes successfully
     - task_failed: When a task fails
@@ -581,7 +820,7 @@ async def process_chat_message_streaming(
         return
     
     # Check for API key - use user's key or fall back to server key
-    api_key = gemini_api_key or FALLBACK_GOOGLE_API_KEY
+    api_key = gemini_api_key or settings.fallback_google_api_key
     
     if not api_key:
         yield {
@@ -605,21 +844,25 @@ async def process_chat_message_streaming(
             "data": {"status": "Processing with AI agent..."}
         }
         
-        # Use regular agent for single/unclear requests
-        try:
-            result = await process_chat_message(message, integration_configs, gemini_api_key=api_key)
-            yield {
-                "event_type": "complete",
-                "data": {
-                    "message": result.message,
-                    "actions_taken": [a.model_dump() for a in result.actions_taken],
-                }
-            }
-        except Exception as e:
-            yield {
-                "event_type": "error",
-                "data": {"message": str(e)}
+        # Use the regular agent for single/unclear requests, streaming its text as well
+        response = await _try_fast_path(message, tools)
+        if response is None:
+            agent = create_agent_executor(tools, api_key=api_key)
+            result: dict[str, Any] = {}
+            try:
+                async for event in _stream_agent_run(agent, message, result):
+                    yield event
+                response = _agent_response(result)
+            except Exception as e:
+                response = _agent_error_response(e)
+        
+        yield {
+            "event_type": "complete",
+            "data": {
+                "message": response.message,
+                "actions_taken": [a.model_dump() for a in response.actions_taken],
             }
+        }
         return
     
     # Step 2: Emit the task plan
@@ -628,8 +871,14 @@ async def process_chat_message_streaming(
         "data": task_plan.to_dict()
     }
     
-    # Step 3: Create agent for execution with user's API key
+    # Step 3: Create agent for execution with user's API key. The plan says how many
+    # tool calls to expect, so cap the steps at one per task plus headroom for a
+    # retry each and the final answer instead of letting a spinning model run on.
     agent = create_agent_executor(tools, api_key=api_key)
+    max_iterations = min(settings.agent_max_iterations, 2 * len(task_plan.tasks) + 1)
+    if max_iterations < agent.max_iterations:
+        # Shallow copy: the cached executor is shared with other requests
+        agent = agent.model_copy(update={"max_iterations": max_iterations})
     
     # Step 4: Execute using the agent with enhanced prompt
     # Build a prompt that explicitly lists all tasks
@@ -650,8 +899,10 @@ Do NOT stop until all tasks are complete."""
     completed_tasks: dict[str, str] = {}  # task_id -> result
     
     try:
-        # Execute with the agent
-        result = agent.invoke({"input": enhanced_message})
+        # Execute with the agent, forwarding model text as it is generated
+        result: dict[str, Any] = {}
+        async for event in _stream_agent_run(agent, enhanced_message, result):
+            yield event
         
         output = result.get("output", "")
         intermediate_steps = result.get("intermediate_steps", [])
@@ -685,13 +936,14 @@ Do NOT stop until all tasks are complete."""
                 }
                 
                 # Check if successful (basic heuristic)
-                is_success = observation and "error" not in str(observation).lower()[:50]
+                observation_text = _observation_text(observation)
+                is_success = observation and "error" not in observation_text.lower()[:50]
                 
                 if is_success:
                     # Update plan
                     if matching_task:
-                        task_plan.update_task_status(task_id, TaskStatus.COMPLETED, str(observation))
-                    completed_tasks[task_id] = str(observation)
+                        task_plan.update_task_status(task_id, TaskStatus.COMPLETED, observation_text)
+                    completed_tasks[task_id] = observation_text
                     
                     # Emit task completed
                     yield {
@@ -700,13 +952,13 @@ Do NOT stop until all tasks are complete."""
                             "task_id": task_id,
                             "service": service,
                             "action": tool_name,
-                            "result": str(observation)[:500],  # Truncate for SSE
+                            "result": observation_text[:500],  # Truncate for SSE
                         }
                     }
                 else:
                     # Update plan
                     if matching_task:
-                        task_plan.update_task_status(task_id, TaskStatus.FAILED, error=str(observation))
+                        task_plan.update_task_status(task_id, TaskStatus.FAILED, error=observation_text)
                     
                     # Emit task failed
                     yield {
@@ -715,16 +967,16 @@ Do NOT stop until all tasks are complete."""
                             "task_id": task_id,
                             "service": service,
                             "action": tool_name,
-                            "error": str(observation)[:500],
+                            "error": observation_text[:500],
                         }
                     }
                 
-                actions_taken.append(ActionResult(
+                actions_taken.append(ActionResult.model_construct(
                     service=service,
                     action=tool_name,
                     success=is_success,
-                    result=str(observation) if is_success else None,
-                    error=str(observation) if not is_success else None
+                    result=observation_text if is_success else None,
+                    error=observation_text if not is_success else None
                 ))
         
         # Step 5: Emit completion
@@ -12,8 +12,10 @@ import httpx
 from langchain_core.tools import BaseTool, tool
 from pydantic import BaseModel, Field
 
-# Store credentials at module level for tool access
-_bugasura_config: dict = {}
+from app.services.tool_config import ToolConfig
+
+# Credentials for the current request, read by the tools at call time
+_bugasura_config = ToolConfig("bugasura_config")
 
 # Bugasura API base URL (per docs)
 BUGASURA_API_BASE = "https://api.bugasura.io"
@@ -280,12 +282,11 @@ def get_bugasura_tools(api_key: str, team_id: str = "", project_key: str = "") -
     Returns:
         List of Bugasura tools
     """
-    global _bugasura_config
-    _bugasura_config = {
+    _bugasura_config.set({
         "api_key": api_key,
         "team_id": team_id,
         "project_key": project_key
-    }
+    })
     
     return [
         bugasura_create_issue,
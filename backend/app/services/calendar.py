@@ -9,15 +9,15 @@ from datetime import datetime, timedelta
 from langchain_core.tools import BaseTool, tool
 from pydantic import BaseModel, Field
 
-# Store credentials at module level for tool access
-_calendar_config: dict = {}
+from app.services.google_auth import is_token_expired, refresh_credentials
+from app.services.tool_config import ToolConfig
+
+# Credentials for the current request, read by the tools at call time
+_calendar_config = ToolConfig("calendar_config")
 
 # Google Calendar API base URL
 CALENDAR_API_BASE = "https://www.googleapis.com/calendar/v3/calendars/primary"
 
-# Google OAuth token refresh URL
-TOKEN_REFRESH_URL = "https://oauth2.googleapis.com/token"
-
 
 class CreateEventInput(BaseModel):
     """Input schema for creating a calendar event."""
@@ -42,57 +42,12 @@ class DeleteEventInput(BaseModel):
 
 def _is_token_expired() -> bool:
     """Check if the current access token is expired."""
-    credentials = _calendar_config.get("credentials", {})
-    if not credentials:
-        return True
-    
-    obtained_at = credentials.get("obtained_at")
-    expires_in = credentials.get("expires_in", 3600)
-    
-    if not obtained_at:
-        return True
-    
-    try:
-        obtained_dt = datetime.fromisoformat(obtained_at)
-        expiry_dt = obtained_dt + timedelta(seconds=expires_in - 60)  # 60 second buffer
-        return datetime.utcnow() > expiry_dt
-    except:
-        return True
+    return is_token_expired(_calendar_config.get("credentials", {}))
 
 
 def _refresh_token() -> bool:
     """Refresh the access token using the refresh token."""
-    credentials = _calendar_config.get("credentials", {})
-    refresh_token = credentials.get("refresh_token")
-    client_id = _calendar_config.get("client_id")
-    client_secret = _calendar_config.get("client_secret")
-    
-    if not refresh_token or not client_id or not client_secret:
-        return False
-    
-    try:
-        with httpx.Client() as client:
-            response = client.post(
-                TOKEN_REFRESH_URL,
-                data={
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                    "refresh_token": refresh_token,
-                    "grant_type": "refresh_token",
-                }
-            )
-            
-            if response.status_code != 200:
-                return False
-            
-            tokens = response.json()
-            # Update credentials with new access token
-            _calendar_config["credentials"]["access_token"] = tokens.get("access_token")
-            _calendar_config["credentials"]["expires_in"] = tokens.get("expires_in", 3600)
-            _calendar_config["credentials"]["obtained_at"] = datetime.utcnow().isoformat()
-            return True
-    except Exception:
-        return False
+    return refresh_credentials(_calendar_config)
 
 
 def _get_access_token() -> str | None:
@@ -329,14 +284,12 @@ def get_calendar_tools(credentials: dict[str, Any] = None) -> list[BaseTool]:
     Returns:
         List of Calendar tools
     """
-    global _calendar_config
-    
     import os
-    _calendar_config = {
+    _calendar_config.set({
         "credentials": credentials,
         "client_id": os.getenv("GOOGLE_CLIENT_ID", ""),
         "client_secret": os.getenv("GOOGLE_CLIENT_SECRET", ""),
-    }
+    })
     
     return [
         calendar_create_event,
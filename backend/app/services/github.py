@@ -10,8 +10,10 @@ from typing import Optional
 from langchain_core.tools import BaseTool, tool
 from pydantic import BaseModel, Field
 
-# Store credentials at module level for tool access
-_github_config: dict = {}
+from app.services.tool_config import ToolConfig
+
+# Credentials for the current request, read by the tools at call time
+_github_config = ToolConfig("github_config")
 GITHUB_API_BASE = "https://api.github.com"
 
 
@@ -548,8 +550,7 @@ def get_github_tools(token: str) -> list[BaseTool]:
     Returns:
         List of GitHub tools
     """
-    global _github_config
-    _github_config = {"token": token}
+    _github_config.set({"token": token})
     
     return [
         # Repository tools
@@ -0,0 +1,136 @@
+"""
+Google Token Refresh
+Shared access-token refresh for the Google service tools
+"""
+
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+import httpx
+
+from app.cache import TTLCache
+
+# Google OAuth token refresh URL
+TOKEN_REFRESH_URL = "https://oauth2.googleapis.com/token"
+
+# Access tokens issued per refresh token. Every Google service is connected through
+# one grant, so a refresh done for one tool (or request) is reused by the others.
+_refreshed_tokens = TTLCache(maxsize=10_000, ttl=3300)
+
+# Striped locks so concurrent refreshes of the same grant wait for the first one
+_refresh_locks = [threading.Lock() for _ in range(64)]
+
+
+def _legacy_obtained_at(obtained_at: Any) -> Optional[float]:
+    """Unix time from a numeric string or an older naive datetime.utcnow().isoformat() value."""
+    try:
+        return float(obtained_at)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(obtained_at).replace(tzinfo=timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def is_token_expired(credentials: dict) -> bool:
+    """Check if an OAuth access token is expired (with a 60 second buffer)."""
+    if not credentials:
+        return True
+
+    obtained_at = credentials.get("obtained_at")
+    if not isinstance(obtained_at, (int, float)):
+        # Legacy ISO string, numeric string, or missing
+        obtained_at = _legacy_obtained_at(obtained_at)
+        if not obtained_at:
+            return True
+
+    return time.time() > obtained_at + (credentials.get("expires_in") or 3600) - 60
+
+
+def _token_key(refresh_token: str) -> bytes:
+    return hashlib.sha256(refresh_token.encode()).digest()
+
+
+def get_cached_token(refresh_token: str) -> Optional[dict[str, Any]]:
+    """Get a still-valid access token previously issued for this refresh token."""
+    token = _refreshed_tokens.get(_token_key(refresh_token))
+    if token is None or token["expires_at"] <= time.time():
+        return None
+    return token
+
+
+def cache_token(refresh_token: str, tokens: dict[str, Any]) -> dict[str, Any]:
+    """
+    Remember a token endpoint response for this refresh token.
+
+    Args:
+        refresh_token: Refresh token the access token was issued for
+        tokens: JSON body returned by the token endpoint
+
+    Returns:
+        Cached entry with access_token, expires_in and obtained_at
+    """
+    expires_in = tokens.get("expires_in", 3600)
+    token = {
+        "access_token": tokens.get("access_token"),
+        "expires_in": expires_in,
+        "obtained_at": int(time.time()),
+        # Stop handing the token out 60 seconds early, like the expiry checks do
+        "expires_at": time.time() + expires_in - 60,
+    }
+    _refreshed_tokens.set(_token_key(refresh_token), token)
+    return token
+
+
+def refresh_credentials(config: dict) -> bool:
+    """
+    Refresh the access token in a Google tool config, in place.
+
+    Reuses a token already issued for the same refresh token when it is
+    still valid, so only the first caller hits Google's token endpoint.
+
+    Args:
+        config: Tool config holding "credentials", "client_id" and "client_secret"
+
+    Returns:
+        True if the credentials now hold a valid access token
+    """
+    credentials = config.get("credentials", {})
+    refresh_token = credentials.get("refresh_token")
+    client_id = config.get("client_id")
+    client_secret = config.get("client_secret")
+
+    if not refresh_token or not client_id or not client_secret:
+        return False
+
+    lock = _refresh_locks[_token_key(refresh_token)[0] % len(_refresh_locks)]
+    with lock:
+        token = get_cached_token(refresh_token)
+        if token is None:
+            try:
+                with httpx.Client() as client:
+                    response = client.post(
+                        TOKEN_REFRESH_URL,
+                        data={
+                            "client_id": client_id,
+                            "client_secret": client_secret,
+                            "refresh_token": refresh_token,
+                            "grant_type": "refresh_token",
+                        }
+                    )
+
+                if response.status_code != 200:
+                    return False
+
+                token = cache_token(refresh_token, response.json())
+            except Exception:
+                return False
+
+    # Update credentials with new access token
+    credentials["access_token"] = token["access_token"]
+    credentials["expires_in"] = token["expires_in"]
+    credentials["obtained_at"] = token["obtained_at"]
+    return True
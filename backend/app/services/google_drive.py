@@ -6,20 +6,19 @@ LangChain tools for file management using direct HTTP API calls
 import httpx
 import base64
 from typing import Any
-from datetime import datetime, timedelta
 from langchain_core.tools import BaseTool, tool
 from pydantic import BaseModel, Field
 
-# Store credentials at module level for tool access
-_drive_config: dict = {}
+from app.services.google_auth import is_token_expired, refresh_credentials
+from app.services.tool_config import ToolConfig
+
+# Credentials for the current request, read by the tools at call time
+_drive_config = ToolConfig("drive_config")
 
 # Google Drive API base URL
 DRIVE_API_BASE = "https://www.googleapis.com/drive/v3"
 DRIVE_UPLOAD_URL = "https://www.googleapis.com/upload/drive/v3/files"
 
-# Google OAuth token refresh URL
-TOKEN_REFRESH_URL = "https://oauth2.googleapis.com/token"
-
 
 class UploadFileInput(BaseModel):
     """Input schema for uploading a file."""
@@ -49,56 +48,12 @@ class ListFilesInput(BaseModel):
 
 def _is_token_expired() -> bool:
     """Check if the current access token is expired."""
-    credentials = _drive_config.get("credentials", {})
-    if not credentials:
-        return True
-    
-    obtained_at = credentials.get("obtained_at")
-    expires_in = credentials.get("expires_in", 3600)
-    
-    if not obtained_at:
-        return True
-    
-    try:
-        obtained_dt = datetime.fromisoformat(obtained_at)
-        expiry_dt = obtained_dt + timedelta(seconds=expires_in - 60)
-        return datetime.utcnow() > expiry_dt
-    except:
-        return True
+    return is_token_expired(_drive_config.get("credentials", {}))
 
 
 def _refresh_token() -> bool:
     """Refresh the access token using the refresh token."""
-    credentials = _drive_config.get("credentials", {})
-    refresh_token = credentials.get("refresh_token")
-    client_id = _drive_config.get("client_id")
-    client_secret = _drive_config.get("client_secret")
-    
-    if not refresh_token or not client_id or not client_secret:
-        return False
-    
-    try:
-        with httpx.Client() as client:
-            response = client.post(
-                TOKEN_REFRESH_URL,
-                data={
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                    "refresh_token": refresh_token,
-                    "grant_type": "refresh_token",
-                }
-            )
-            
-            if response.status_code != 200:
-                return False
-            
-            tokens = response.json()
-            _drive_config["credentials"]["access_token"] = tokens.get("access_token")
-            _drive_config["credentials"]["expires_in"] = tokens.get("expires_in", 3600)
-            _drive_config["credentials"]["obtained_at"] = datetime.utcnow().isoformat()
-            return True
-    except Exception:
-        return False
+    return refresh_credentials(_drive_config)
 
 
 def _get_access_token() -> str | None:
@@ -293,14 +248,12 @@ def get_drive_tools(credentials: dict[str, Any] = None) -> list[BaseTool]:
     Returns:
         List of Google Drive tools
     """
-    global _drive_config
-    
     import os
-    _drive_config = {
+    _drive_config.set({
         "credentials": credentials,
         "client_id": os.getenv("GOOGLE_CLIENT_ID", ""),
         "client_secret": os.getenv("GOOGLE_CLIENT_SECRET", ""),
-    }
+    })
     
     return [
         drive_upload_file,
@@ -5,19 +5,18 @@ LangChain tools for presentation management using direct HTTP API calls
 
 import httpx
 from typing import Any
-from datetime import datetime, timedelta
 from langchain_core.tools import BaseTool, tool
 from pydantic import BaseModel, Field
 
-# Store credentials at module level for tool access
-_slides_config: dict = {}
+from app.services.google_auth import is_token_expired, refresh_credentials
+from app.services.tool_config import ToolConfig
+
+# Credentials for the current request, read by the tools at call time
+_slides_config = ToolConfig("slides_config")
 
 # Google Slides API base URL
 SLIDES_API_BASE = "https://slides.googleapis.com/v1/presentations"
 
-# Google OAuth token refresh URL
-TOKEN_REFRESH_URL = "https://oauth2.googleapis.com/token"
-
 
 class CreatePresentationInput(BaseModel):
     """Input schema for creating a presentation."""
@@ -30,56 +29,12 @@ class CreatePresentationInput(BaseModel):
 
 def _is_token_expired() -> bool:
     """Check if the current access token is expired."""
-    credentials = _slides_config.get("credentials", {})
-    if not credentials:
-        return True
-    
-    obtained_at = credentials.get("obtained_at")
-    expires_in = credentials.get("expires_in", 3600)
-    
-    if not obtained_at:
-        return True
-    
-    try:
-        obtained_dt = datetime.fromisoformat(obtained_at)
-        expiry_dt = obtained_dt + timedelta(seconds=expires_in - 60)
-        return datetime.utcnow() > expiry_dt
-    except:
-        return True
+    return is_token_expired(_slides_config.get("credentials", {}))
 
 
 def _refresh_token() -> bool:
     """Refresh the access token using the refresh token."""
-    credentials = _slides_config.get("credentials", {})
-    refresh_token = credentials.get("refresh_token")
-    client_id = _slides_config.get("client_id")
-    client_secret = _slides_config.get("client_secret")
-    
-    if not refresh_token or not client_id or not client_secret:
-        return False
-    
-    try:
-        with httpx.Client() as client:
-            response = client.post(
-                TOKEN_REFRESH_URL,
-                data={
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                    "refresh_token": refresh_token,
-                    "grant_type": "refresh_token",
-                }
-            )
-            
-            if response.status_code != 200:
-                return False
-            
-            tokens = response.json()
-            _slides_config["credentials"]["access_token"] = tokens.get("access_token")
-            _slides_config["credentials"]["expires_in"] = tokens.get("expires_in", 3600)
-            _slides_config["credentials"]["obtained_at"] = datetime.utcnow().isoformat()
-            return True
-    except Exception:
-        return False
+    return refresh_credentials(_slides_config)
 
 
 def _get_access_token() -> str | None:
@@ -221,14 +176,12 @@ def get_slides_tools(credentials: dict[str, Any] = None) -> list[BaseTool]:
     Returns:
         List of Google Slides tools
     """
-    global _slides_config
-    
     import os
-    _slides_config = {
+    _slides_config.set({
         "credentials": credentials,
         "client_id": os.getenv("GOOGLE_CLIENT_ID", ""),
         "client_secret": os.getenv("GOOGLE_CLIENT_SECRET", ""),
-    }
+    })
     
     return [
         slides_create_presentation,
@@ -14,8 +14,10 @@ from typing import Optional
 from langchain_core.tools import BaseTool, tool
 from pydantic import BaseModel, Field
 
-# Store credentials at module level for tool access
-_jira_config: dict = {}
+from app.services.tool_config import ToolConfig
+
+# Credentials for the current request, read by the tools at call time
+_jira_config = ToolConfig("jira_config")
 
 
 # ============================================================================
@@ -687,12 +689,11 @@ def get_jira_tools(
     Returns:
         List of Jira tools
     """
-    global _jira_config
-    _jira_config = {
+    _jira_config.set({
         "api_token": api_token,
         "email": email,
         "url": url
-    }
+    })
     
     return [
         # Issue management
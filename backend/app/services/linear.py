@@ -11,8 +11,10 @@ from typing import Optional
 from langchain_core.tools import BaseTool, tool
 from pydantic import BaseModel, Field
 
-# Store credentials at module level for tool access
-_linear_config: dict = {}
+from app.services.tool_config import ToolConfig
+
+# Credentials for the current request, read by the tools at call time
+_linear_config = ToolConfig("linear_config")
 LINEAR_API_URL = "https://api.linear.app/graphql"
 
 
@@ -572,8 +574,7 @@ def get_linear_tools(api_key: str) -> list[BaseTool]:
     Returns:
         List of Linear tools
     """
-    global _linear_config
-    _linear_config = {"api_key": api_key}
+    _linear_config.set({"api_key": api_key})
     
     return [
         # Team tools
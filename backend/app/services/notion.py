@@ -6,8 +6,10 @@ LangChain tools for Notion documentation
 from langchain_core.tools import BaseTool, tool
 from pydantic import BaseModel, Field
 
-# Store credentials at module level for tool access
-_notion_config: dict = {}
+from app.services.tool_config import ToolConfig
+
+# Credentials for the current request, read by the tools at call time
+_notion_config = ToolConfig("notion_config")
 
 
 class SearchNotionInput(BaseModel):
@@ -461,8 +463,7 @@ def get_notion_tools(integration_token: str) -> list[BaseTool]:
     Returns:
         List of Notion tools
     """
-    global _notion_config
-    _notion_config = {"integration_token": integration_token}
+    _notion_config.set({"integration_token": integration_token})
     
     return [
         notion_search,
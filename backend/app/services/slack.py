@@ -6,8 +6,10 @@ LangChain tools for Slack messaging
 from langchain_core.tools import BaseTool, tool
 from pydantic import BaseModel, Field
 
-# Store credentials at module level for tool access
-_slack_config: dict = {}
+from app.services.tool_config import ToolConfig
+
+# Credentials for the current request, read by the tools at call time
+_slack_config = ToolConfig("slack_config")
 
 
 class SendMessageInput(BaseModel):
@@ -213,8 +215,7 @@ def get_slack_tools(bot_token: str) -> list[BaseTool]:
     Returns:
         List of Slack tools
     """
-    global _slack_config
-    _slack_config = {"bot_token": bot_token}
+    _slack_config.set({"bot_token": bot_token})
     
     return [
         slack_send_message,
@@ -9,6 +9,7 @@ from typing import Optional, Any
 from enum import Enum
 import json
 import os
+from functools import lru_cache
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
@@ -237,6 +238,16 @@ Return ONLY valid JSON array. Example format:
 Return ONLY the JSON array, no other text."""
 
 
+@lru_cache(maxsize=1)
+def _get_planner_llm(google_api_key: str) -> ChatGoogleGenerativeAI:
+    """Planner LLM for the server-level key, created once and reused across requests."""
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash",
+        google_api_key=google_api_key,
+        temperature=0,
+    )
+
+
 def parse_tasks_from_message(message: str, available_services: list[str]) -> TaskPlan:
     """
     Use LLM to parse user message and extract individual tasks.
@@ -255,11 +266,7 @@ def parse_tasks_from_message(message: str, available_services: list[str]) -> Tas
         return _fallback_parse_tasks(message, available_services)
     
     try:
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            google_api_key=google_api_key,
-            temperature=0,
-        )
+        llm = _get_planner_llm(google_api_key)
         
         prompt = ChatPromptTemplate.from_template(TASK_PLANNING_PROMPT)
         chain = prompt | llm
@@ -0,0 +1,30 @@
+"""
+Tool Config
+Per-request integration config for the LangChain tool modules
+"""
+
+from contextvars import ContextVar
+from typing import Any
+
+
+class ToolConfig:
+    """
+    Integration config read by a module's tools at call time.
+
+    Backed by a ContextVar rather than a module global, so each request (and
+    the worker threads it runs tools in) sees only the config its own
+    get_*_tools call set, even while other users' agents run concurrently.
+    """
+
+    def __init__(self, name: str):
+        self._var: ContextVar[dict[str, Any]] = ContextVar(name)
+
+    def set(self, config: dict[str, Any]) -> None:
+        """Set the config for the current request."""
+        self._var.set(config)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._var.get({}).get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._var.get({})[key]
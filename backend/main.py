@@ -3,19 +3,36 @@ Locus - Enterprise Integration Store
 FastAPI Backend Entry Point
 """
 
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.database import engine, Base
+from app import oauth_state
+from app.http_client import close_http_client
 from app.routers import auth, chat, google_oauth, linear_oauth, conversations, settings
+from app.services.agent import close_llm_clients
+
+# Blocking work awaited from async code - sync LangChain tools and asyncio.to_thread
+# DB calls - runs on the loop's default executor. It is I/O bound, so size the pool
+# for concurrency rather than the CPU-based default (min(32, cores + 4)).
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", "32"))
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Create database tables on startup."""
+    """Create database tables on startup; release shared clients on shutdown."""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix="worker")
+    )
     Base.metadata.create_all(bind=engine)
     yield
+    close_llm_clients()
+    await oauth_state.close()
+    await close_http_client()
 
 
 app = FastAPI(
@@ -0,0 +1,30 @@
+"""
+Migration script to add composite indexes matching the hot query patterns.
+Run this once on existing databases (new databases get them from the models).
+"""
+
+from sqlalchemy import text
+from app.database import engine
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_conversations_owner_activity "
+    "ON conversations (owner_id, coalesce(updated_at, created_at), id)",
+    "CREATE INDEX IF NOT EXISTS ix_messages_conversation_created "
+    "ON messages (conversation_id, created_at)",
+]
+
+def migrate():
+    """Create the composite indexes and drop the indexes they supersede."""
+    with engine.connect() as conn:
+        for statement in INDEXES:
+            conn.execute(text(statement))
+        
+        # Covered by the unique (owner_id, service_name) index from migrate_integration_unique.py
+        conn.execute(text("DROP INDEX IF EXISTS ix_integrations_service_name"))
+        # Superseded by ix_conversations_owner_activity, which the coalesce ORDER BY can use
+        conn.execute(text("DROP INDEX IF EXISTS ix_conversations_owner_updated"))
+        conn.commit()
+        print("[OK] Composite indexes are in place")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,29 @@
+"""
+Migration script to add secrets_fingerprint column to integrations table.
+Run this once to sync your database with the updated Integration model.
+Existing rows keep a NULL fingerprint and get one on their next write.
+"""
+
+from sqlalchemy import text
+from app.database import engine
+
+def migrate():
+    """Add secrets_fingerprint column to integrations table if it doesn't exist."""
+    with engine.connect() as conn:
+        # Check if column already exists
+        result = conn.execute(text("""
+            SELECT column_name 
+            FROM information_schema.columns 
+            WHERE table_name = 'integrations' AND column_name = 'secrets_fingerprint'
+        """))
+        
+        if result.fetchone() is None:
+            print("Adding 'secrets_fingerprint' column to integrations table...")
+            conn.execute(text("ALTER TABLE integrations ADD COLUMN secrets_fingerprint VARCHAR(32)"))
+            conn.commit()
+            print("[OK] Column added successfully!")
+        else:
+            print("[OK] Column 'secrets_fingerprint' already exists. No changes needed.")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,64 @@
+"""
+Migration script to store encrypted columns as binary AES-GCM payloads.
+Run this once to sync your database with the updated User and Integration models.
+
+Converts users.encrypted_gemini_key, integrations.encrypted_api_key and
+integrations.encrypted_credentials from base64 text to BYTEA holding
+version byte || nonce || ciphertext || tag. Legacy Fernet values are
+re-encrypted; the script is safe to run more than once.
+"""
+
+from sqlalchemy import text
+from app.database import engine
+from app import security
+
+ENCRYPTED_COLUMNS = [
+    ("users", "encrypted_gemini_key"),
+    ("integrations", "encrypted_api_key"),
+    ("integrations", "encrypted_credentials"),
+]
+
+def migrate():
+    """Change the encrypted columns to BYTEA and convert their values."""
+    with engine.connect() as conn:
+        is_postgres = conn.dialect.name == "postgresql"
+
+        for table, column in ENCRYPTED_COLUMNS:
+            if is_postgres:
+                # Check the current column type
+                data_type = conn.execute(text("""
+                    SELECT data_type
+                    FROM information_schema.columns
+                    WHERE table_name = :table AND column_name = :column
+                """), {"table": table, "column": column}).scalar()
+
+                if data_type == "text":
+                    print(f"Changing '{table}.{column}' to BYTEA...")
+                    conn.execute(text(
+                        f"ALTER TABLE {table} ALTER COLUMN {column} "
+                        f"TYPE BYTEA USING convert_to({column}, 'UTF8')"
+                    ))
+
+            # Convert base64 / Fernet values to the binary format
+            rows = conn.execute(text(
+                f"SELECT id, {column} FROM {table} WHERE {column} IS NOT NULL"
+            )).all()
+            converted = 0
+            for row_id, value in rows:
+                if not value:
+                    continue
+                if isinstance(value, memoryview):
+                    value = bytes(value)
+                binary = security.to_binary_ciphertext(value)
+                if binary != value:
+                    conn.execute(
+                        text(f"UPDATE {table} SET {column} = :value WHERE id = :id"),
+                        {"value": binary, "id": row_id}
+                    )
+                    converted += 1
+            print(f"[OK] {table}.{column}: converted {converted} of {len(rows)} values")
+
+        conn.commit()
+
+if __name__ == "__main__":
+    migrate()
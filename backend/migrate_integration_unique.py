@@ -0,0 +1,29 @@
+"""
+Migration script to add a unique (owner_id, service_name) index to integrations.
+Required by the integration upsert. Run this once on existing databases.
+"""
+
+from sqlalchemy import text
+from app.database import engine
+
+def migrate():
+    """Remove duplicate integrations and add the unique owner/service index."""
+    with engine.connect() as conn:
+        # Keep only the newest row for each (owner_id, service_name) pair
+        result = conn.execute(text("""
+            DELETE FROM integrations
+            WHERE id NOT IN (
+                SELECT MAX(id) FROM integrations GROUP BY owner_id, service_name
+            )
+        """))
+        print(f"[OK] Removed {result.rowcount} duplicate integration(s)")
+        
+        conn.execute(text("""
+            CREATE UNIQUE INDEX IF NOT EXISTS uq_integrations_owner_service
+            ON integrations (owner_id, service_name)
+        """))
+        conn.commit()
+        print("[OK] Unique index 'uq_integrations_owner_service' is in place")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,50 @@
+"""
+Migration script to make messages.conversation_id cascade on delete.
+Required by delete_conversation, which issues a single DELETE and leaves
+removing the messages to the database. Run this once on existing PostgreSQL
+databases (SQLite tables created by the app need no change beyond the
+foreign_keys pragma the engine now enables).
+"""
+
+from sqlalchemy import text
+from app.database import engine
+
+def migrate():
+    """Recreate the messages -> conversations foreign key with ON DELETE CASCADE."""
+    with engine.connect() as conn:
+        if conn.dialect.name != "postgresql":
+            print("[SKIP] Only needed on PostgreSQL")
+            return
+        
+        # Find the current foreign key and its delete rule
+        row = conn.execute(text("""
+            SELECT rc.constraint_name, rc.delete_rule
+            FROM information_schema.referential_constraints rc
+            JOIN information_schema.key_column_usage kcu
+              ON kcu.constraint_name = rc.constraint_name
+            WHERE kcu.table_name = 'messages' AND kcu.column_name = 'conversation_id'
+        """)).first()
+        
+        if row is not None and row.delete_rule == "CASCADE":
+            print("[OK] messages.conversation_id already cascades on delete")
+            return
+        
+        # Remove messages whose conversation no longer exists, then swap the constraint
+        result = conn.execute(text("""
+            DELETE FROM messages
+            WHERE conversation_id NOT IN (SELECT id FROM conversations)
+        """))
+        print(f"[OK] Removed {result.rowcount} orphaned message(s)")
+        
+        if row is not None:
+            conn.execute(text(f'ALTER TABLE messages DROP CONSTRAINT "{row.constraint_name}"'))
+        conn.execute(text("""
+            ALTER TABLE messages
+            ADD CONSTRAINT messages_conversation_id_fkey
+            FOREIGN KEY (conversation_id) REFERENCES conversations (id) ON DELETE CASCADE
+        """))
+        conn.commit()
+        print("[OK] messages.conversation_id now cascades on delete")
+
+if __name__ == "__main__":
+    migrate()